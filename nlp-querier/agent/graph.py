@@ -5,13 +5,14 @@ This module defines the complete workflow graph with conditional edges,
 retry logic, and user clarification support using LangGraph.
 """
 from typing import List, Dict, Any, Literal
+import functools
 import logging
 import os
 from datetime import datetime
 from pathlib import Path
 from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.memory import MemorySaver
 
+from agent import query_cache
 from agent.state import AgentState
 from agent.nodes.intent import intent_node
 from agent.nodes.clarification import clarification_node
@@ -301,6 +302,24 @@ def create_analytics_graph() -> StateGraph:
     return workflow
 
 
+@functools.lru_cache(maxsize=1)
+def get_compiled_graph():
+    """
+    Build and compile the analytics workflow once per process.
+    
+    The compiled graph holds no per-run state and can be streamed from several
+    threads. It has no checkpointer because every run starts from a complete
+    initial state and nothing is resumed from saved checkpoints.
+    
+    Returns:
+        Compiled LangGraph application
+    """
+    logger.info("🔨 Creating and compiling LangGraph workflow...")
+    app = create_analytics_graph().compile()
+    logger.info("✅ Workflow compiled successfully")
+    return app
+
+
 # In agent/graph.py
 
 def decide_after_intent(state: AgentState) -> Literal["clarification", "lookup_schema", "operation_not_permitted"]:
@@ -423,6 +442,57 @@ def decide_after_error_fix(state: AgentState) -> Literal["validate_sql", "error"
         return "error"
 
 
+def compact_history(
+    history: List[Dict[str, Any]],
+    max_messages: int = 10,
+    max_chars_per_message: int = 2000
+) -> List[Dict[str, Any]]:
+    """
+    Reduce conversation history to the compact form the workflow reads.
+    
+    Prompts only look at the last few messages and their role, content, SQL and
+    result summary, so older turns and other per-message fields are dropped and
+    long contents keep only their head and tail. The most recent message with SQL
+    is always kept, even when it is older than the window, because follow-up
+    questions build on that query as last_sql.
+    
+    Args:
+        history: Conversation history messages
+        max_messages: Number of most recent messages to keep
+        max_chars_per_message: Longest content kept before truncating the middle
+        
+    Returns:
+        List of {role, content[, sql][, result_summary]} dictionaries
+    """
+    messages = [
+        # Message objects (e.g. LangChain) expose type/content attributes instead of keys
+        msg if isinstance(msg, dict)
+        else {"role": getattr(msg, "type", "unknown"), "content": getattr(msg, "content", str(msg))}
+        for msg in history
+    ]
+    recent = messages[-max_messages:] if max_messages > 0 else []
+    if not any(msg.get("sql") for msg in recent):
+        older_sql = [msg for msg in messages[:len(messages) - len(recent)] if msg.get("sql")]
+        if older_sql:
+            recent = [older_sql[-1]] + recent
+    
+    half = max_chars_per_message // 2
+    compacted = []
+    for msg in recent:
+        content = str(msg.get("content", ""))
+        if len(content) > max_chars_per_message:
+            content = f"{content[:half]}\n...\n{content[-half:]}"
+        
+        entry = {"role": msg.get("role", "unknown"), "content": content}
+        if msg.get("sql"):
+            entry["sql"] = msg["sql"]
+        if msg.get("result_summary"):
+            entry["result_summary"] = msg["result_summary"]
+        compacted.append(entry)
+    
+    return compacted
+
+
 def run_agent_chat(question: str, history: List[Dict[str, str]], **kwargs) -> Dict[str, Any]:
     """
     Run the analytics agent chat workflow.
@@ -430,22 +500,26 @@ def run_agent_chat(question: str, history: List[Dict[str, str]], **kwargs) -> Di
     Args:
         question: User's natural language question
         history: Conversation history
-        **kwargs: Additional configuration parameters
+        **kwargs: Additional configuration parameters; ``on_step`` is called with
+            the name of each node as it finishes, e.g. to report progress
         
     Returns:
         Dictionary containing results and updated conversation history
     """
+    history = compact_history(history)
+    on_step = kwargs.get("on_step")
+    
     logger.info("="*80)
     logger.info("🚀 STARTING ANALYTICS AGENT WORKFLOW")
     logger.info("="*80)
-    logger.info(f"📥 User Question: {question}")
-    logger.info(f"📚 History Length: {len(history)} messages")
-    logger.info(f"⚙️  Max Retries: {kwargs.get('max_retries', 3)}")
+    logger.info("📥 User Question: %s", question)
+    logger.info("📚 History Length: %d messages", len(history))
+    logger.info("⚙️  Max Retries: %s", kwargs.get('max_retries', 3))
     
     # Initialize state
     initial_state: AgentState = {
         "question": question,
-        "history": history.copy(),
+        "history": history,
         "schema": None,
         "generated_sql": None,
         "validated_sql": None,
@@ -466,11 +540,16 @@ def run_agent_chat(question: str, history: List[Dict[str, str]], **kwargs) -> Di
     logger.info("🔧 Initial state prepared")
     
     try:
-        # Create and compile the workflow
-        logger.info("🔨 Creating and compiling LangGraph workflow...")
-        workflow = create_analytics_graph()
-        app = workflow.compile(checkpointer=MemorySaver())
-        logger.info("✅ Workflow compiled successfully")
+        # Serve repeated questions in the same conversation from the query cache
+        cache_key = query_cache.make_key(question, history) if query_cache.is_enabled() else None
+        if cache_key:
+            cached_result = query_cache.get(cache_key)
+            if cached_result is not None:
+                logger.info("♻️ Returning cached result for repeated question")
+                cached_result["from_cache"] = True
+                return cached_result
+        
+        app = get_compiled_graph()
         
         # Run the workflow
         thread_id = kwargs.get("thread_id", "default")
@@ -479,7 +558,7 @@ def run_agent_chat(question: str, history: List[Dict[str, str]], **kwargs) -> Di
             "recursion_limit": kwargs.get("recursion_limit", 50)  
         }
         
-        logger.info(f"🧵 Starting workflow execution (thread_id: {thread_id})")
+        logger.info("🧵 Starting workflow execution (thread_id: %s)", thread_id)
         
         step_count = 0
         executed_nodes = []  # Track the actual execution path
@@ -491,7 +570,9 @@ def run_agent_chat(question: str, history: List[Dict[str, str]], **kwargs) -> Di
             # Log current step and track executed nodes
             if isinstance(state, dict) and state:
                 current_node = list(state.keys())[0]
-                logger.info(f"📍 Step {step_count}: Executing node '{current_node}'")
+                logger.info("📍 Step %d: Executing node '%s'", step_count, current_node)
+                if on_step:
+                    on_step(current_node)
                 
                 # Track unique nodes in execution order
                 if current_node not in executed_nodes:
@@ -501,9 +582,9 @@ def run_agent_chat(question: str, history: List[Dict[str, str]], **kwargs) -> Di
                 node_state = state[current_node]
                 if isinstance(node_state, dict):
                     if node_state.get("execution_error"):
-                        logger.warning(f"⚠️  Execution error in {current_node}: {node_state.get('execution_error')}")
+                        logger.warning("⚠️  Execution error in %s: %s", current_node, node_state.get('execution_error'))
                     if node_state.get("generated_sql"):
-                        logger.info(f"🔍 Generated SQL: {node_state.get('generated_sql')[:100]}...")
+                        logger.info("🔍 Generated SQL: %s...", node_state.get('generated_sql')[:100])
                     if node_state.get("validated_sql"):
                         logger.info("✅ SQL validation passed")
                     if node_state.get("summary"):
@@ -515,28 +596,28 @@ def run_agent_chat(question: str, history: List[Dict[str, str]], **kwargs) -> Di
                     logger.info("⏸️  Workflow paused for user clarification")
                     break
         
-        logger.info(f"🏁 Workflow completed after {step_count} steps")
+        logger.info("🏁 Workflow completed after %d steps", step_count)
         
         # Extract results from final state
         if final_state:
             # Debug: Log the structure of the final state
-            logger.info(f"🔍 Final state type: {type(final_state)}")
-            logger.info(f"🔍 Final state keys: {list(final_state.keys()) if isinstance(final_state, dict) else 'not a dict'}")
+            logger.info("🔍 Final state type: %s", type(final_state))
+            logger.info("🔍 Final state keys: %s", list(final_state.keys()) if isinstance(final_state, dict) else 'not a dict')
             
             result_state = list(final_state.values())[0] if isinstance(final_state, dict) else final_state
             
             # Debug: Log the result state
-            logger.info(f"🔍 Result state type: {type(result_state)}")
+            logger.info("🔍 Result state type: %s", type(result_state))
             if isinstance(result_state, dict):
-                logger.info(f"🔍 Result state keys: {list(result_state.keys())}")
-                logger.info(f"🔍 Summary in result state: {'✅' if result_state.get('summary') else '❌'}")
+                logger.info("🔍 Result state keys: %s", list(result_state.keys()))
+                logger.info("🔍 Summary in result state: %s", '✅' if result_state.get('summary') else '❌')
                 if result_state.get('summary'):
-                    logger.info(f"🔍 Summary length: {len(result_state.get('summary'))}")
+                    logger.info("🔍 Summary length: %d", len(result_state.get('summary')))
             
             logger.info("📊 WORKFLOW RESULTS:")
-            logger.info(f"  - SQL Generated: {'✅' if result_state.get('validated_sql') else '❌'}")
-            logger.info(f"  - Summary: {'✅' if result_state.get('summary') else '❌'}")
-            logger.info(f"  - Errors: {'❌ ' + str(result_state.get('execution_error')) if result_state.get('execution_error') else '✅ None'}")
+            logger.info("  - SQL Generated: %s", '✅' if result_state.get('validated_sql') else '❌')
+            logger.info("  - Summary: %s", '✅' if result_state.get('summary') else '❌')
+            logger.info("  - Errors: %s", '❌ ' + str(result_state.get('execution_error')) if result_state.get('execution_error') else '✅ None')
             
             if result_state.get("operation_not_permitted"):
                 result = {
@@ -567,6 +648,11 @@ def run_agent_chat(question: str, history: List[Dict[str, str]], **kwargs) -> Di
             # Generate and log the execution flow diagram
             #log_execution_flow_diagram(executed_nodes, question, step_count)
             
+            # Only cache complete answers; errors and clarification prompts must be retried
+            if (cache_key and not result.get("error") and not result.get("execution_error")
+                    and not result.get("clarification_needed")):
+                query_cache.put(cache_key, result)
+            
             return result
         else:
             logger.error("❌ Workflow failed to produce results")
@@ -579,9 +665,9 @@ def run_agent_chat(question: str, history: List[Dict[str, str]], **kwargs) -> Di
         logger.error("="*80)
         logger.error("💥 ANALYTICS AGENT WORKFLOW ERROR")
         logger.error("="*80)
-        logger.error(f"❌ Error Type: {type(e).__name__}")
-        logger.error(f"❌ Error Message: {e}")
-        logger.error(f"❌ Question: {question}")
+        logger.error("❌ Error Type: %s", type(e).__name__)
+        logger.error("❌ Error Message: %s", e)
+        logger.error("❌ Question: %s", question)
         logger.error("="*80)
         return {
             "error": str(e),
@@ -606,9 +692,7 @@ def continue_agent_chat(
         Dictionary containing results and updated conversation history
     """
     try:
-        # Create and compile the workflow
-        workflow = create_analytics_graph()
-        app = workflow.compile(checkpointer=MemorySaver())
+        app = get_compiled_graph()
         
         config = {"configurable": {"thread_id": thread_id}}
         
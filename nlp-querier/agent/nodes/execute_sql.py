@@ -7,7 +7,7 @@ from typing import Dict, Any
 import logging
 import pandas as pd
 from agent.state import AgentState
-from agent.tools.sql_executor_tool import create_sql_executor_tool
+from agent.tools.sql_executor_tool import get_sql_executor_tool
 from utils.enhanced_pii_redactor import EnhancedPIIRedactor, RedactionMode
 from config import get_config
 
@@ -58,11 +58,11 @@ def execute_sql_node(state: AgentState) -> AgentState:
             new_state['execution_error'] = "No validated SQL query to execute"
             return new_state
         
-        logger.info("📝 SQL to execute:")
-        for i, line in enumerate(validated_sql.split('\n')[:10], 1):  # First 10 lines
-            logger.info(f"    {i:2d}: {line}")
-        if len(validated_sql.split('\n')) > 10:
-            logger.info("    ... (truncated)")
+        sql_lines = validated_sql.split('\n')
+        numbered_sql = "\n".join(f"    {i:2d}: {line}" for i, line in enumerate(sql_lines[:10], 1))  # First 10 lines
+        if len(sql_lines) > 10:
+            numbered_sql += "\n    ... (truncated)"
+        logger.info(f"📝 SQL to execute:\n{numbered_sql}")
         
         # Get configuration
         logger.info("🔧 Setting up database executor...")
@@ -75,13 +75,13 @@ def execute_sql_node(state: AgentState) -> AgentState:
         if db_type == "sqlite":
             # Extract path from sqlite:///./output/fcfp_analytics.db
             db_path = db_config["connection_string"].replace("sqlite:///./", "")
-            executor_tool = create_sql_executor_tool(
+            executor_tool = get_sql_executor_tool(
                 db_type="sqlite",
                 db_path=db_path
             )
             logger.info(f"  - SQLite Path: {db_path}")
         elif db_type == "postgresql":
-            executor_tool = create_sql_executor_tool(
+            executor_tool = get_sql_executor_tool(
                 db_type="postgresql",
                 connection_string=db_config["connection_string"]
             )
@@ -140,26 +140,10 @@ def execute_sql_node(state: AgentState) -> AgentState:
                     enable_name_redaction=True
                 )
                 
-                # Apply redaction to all string columns
-                redacted_df = result_data.copy()
-                pii_findings = {}
-                total_pii_count = 0
-                
-                for column in redacted_df.columns:
-                    if redacted_df[column].dtype == 'object':  # String columns
-                        column_findings = []
-                        
-                        # Apply redaction to each cell
-                        for idx in redacted_df.index:
-                            original_value = str(redacted_df.at[idx, column])
-                            if original_value and original_value != 'None':
-                                redacted_value, findings = pii_redactor.redact_text(original_value)
-                                redacted_df.at[idx, column] = redacted_value
-                                column_findings.extend(findings)
-                        
-                        if column_findings:
-                            pii_findings[column] = column_findings
-                            total_pii_count += len(column_findings)
+                # Apply redaction to all string columns. The raw frame is not used after
+                # this point, so redact in place instead of holding a second full copy.
+                redacted_df, pii_findings = pii_redactor.redact_dataframe(result_data, inplace=True)
+                total_pii_count = sum(len(findings) for findings in pii_findings.values())
                 
                 if pii_findings:
                     logger.warning(f"🚨 PII DETECTED: {total_pii_count} instances found and pseudonymized in {len(pii_findings)} columns")
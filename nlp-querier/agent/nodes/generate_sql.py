@@ -6,7 +6,7 @@ Generates SQL queries from natural language using AI models.
 from typing import Dict, Any
 import logging
 from agent.state import AgentState
-from agent.tools.sql_gen_tool import create_sql_gen_tool
+from agent.tools.sql_gen_tool import create_sql_gen_tool, get_sql_gen_tool
 from config import get_config
 
 logger = logging.getLogger(__name__)
@@ -63,7 +63,7 @@ def generate_sql_node(state: AgentState) -> AgentState:
         # Create SQL generation tool (fallback to rule-based if Vertex AI fails)
         try:
             logger.info("🤖 Attempting Vertex AI SQL generation...")
-            sql_gen_tool = create_sql_gen_tool(
+            sql_gen_tool = get_sql_gen_tool(
                 "vertex_ai",
                 project_id=config["ai"]["project_id"],
                 model_name=config["ai"]["model_name"],
@@ -116,11 +116,11 @@ def generate_sql_node(state: AgentState) -> AgentState:
         logger.info(f"  - Explanation: {explanation[:100]}..." if len(explanation) > 100 else f"  - Explanation: {explanation}")
         
         if generated_sql:
-            logger.info("📝 Generated SQL:")
-            for i, line in enumerate(generated_sql.split('\n')[:10], 1):  # First 10 lines
-                logger.info(f"    {i:2d}: {line}")
-            if len(generated_sql.split('\n')) > 10:
-                logger.info("    ... (truncated)")
+            sql_lines = generated_sql.split('\n')
+            numbered_sql = "\n".join(f"    {i:2d}: {line}" for i, line in enumerate(sql_lines[:10], 1))  # First 10 lines
+            if len(sql_lines) > 10:
+                numbered_sql += "\n    ... (truncated)"
+            logger.info(f"📝 Generated SQL:\n{numbered_sql}")
         
         new_state['generated_sql'] = generated_sql
         new_state['sql_explanation'] = explanation
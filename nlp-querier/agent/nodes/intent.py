@@ -9,7 +9,7 @@ import logging
 import re
 from agent.state import AgentState
 import json
-from agent.tools.sql_gen_tool import create_sql_gen_tool
+from agent.tools.sql_gen_tool import get_sql_gen_tool
 from config import get_config
 
 logger = logging.getLogger(__name__)
@@ -159,7 +159,7 @@ Respond with JSON:
 {{"status": "clear"}} or {{"status": "ambiguous", "reason": "brief reason", "question": "specific clarification needed"}}"""
 
             # Use Vertex AI for intent analysis
-            sql_tool = create_sql_gen_tool(
+            sql_tool = get_sql_gen_tool(
                 "vertex_ai",
                 project_id=config["ai"]["project_id"],
                 model_name=config["ai"]["model_name"],
@@ -3,6 +3,7 @@ Interpret Results Node - Generate business insights from query results
 """
 import logging
 from typing import Dict, Any
+import pandas as pd
 from agent.state import AgentState
 from agent.tools.results_interpreter_tool import ResultsInterpreterTool
 
@@ -47,7 +48,6 @@ def interpret_results(state: AgentState) -> AgentState:
         if isinstance(execution_result, dict):
             if execution_result.get("type") == "dataframe" and execution_result.get("data"):
                 # Convert back to DataFrame for interpretation
-                import pandas as pd
                 df = pd.DataFrame(execution_result["data"])
             else:
                 logger.warning("⚠️ Execution result is not in expected DataFrame format")
@@ -3,14 +3,54 @@ Schema Lookup Node for LangGraph Analytics Agent.
 Retrieves database schema for SQL generation.
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 import logging
+import os
 from agent.state import AgentState
 from agent.tools.schema_tool import SQLiteSchemaLookupTool
 from config import get_config
 
 logger = logging.getLogger(__name__)
 
+# Schema text per database path, tagged with the file's mtime at lookup time
+_SCHEMA_CACHE: Dict[str, Tuple[float, str]] = {}
+
+
+def _get_cached_schema(db_path: str) -> str:
+    """
+    Return the schema for a SQLite database, introspecting it only when needed.
+    
+    The schema is reused across queries until the database file changes on disk.
+    Failed lookups are not cached so the next query retries.
+    
+    Args:
+        db_path: Path to the SQLite database file
+        
+    Returns:
+        Formatted schema string
+    """
+    try:
+        mtime = os.path.getmtime(db_path)
+    except OSError:
+        mtime = None
+    
+    cached = _SCHEMA_CACHE.get(db_path)
+    if cached is not None and mtime is not None and cached[0] == mtime:
+        logger.info("♻️ Using cached schema")
+        return cached[1]
+    
+    schema_tool = SQLiteSchemaLookupTool(db_path)
+    schema = schema_tool.get_schema()
+    
+    if mtime is not None and not schema.startswith("Error retrieving schema"):
+        _SCHEMA_CACHE[db_path] = (mtime, schema)
+    return schema
+
+
+def clear_schema_cache() -> None:
+    """Drop all cached schemas, forcing the next lookup to introspect the database."""
+    _SCHEMA_CACHE.clear()
+
 
 def lookup_schema_node(state: AgentState) -> AgentState:
     """
@@ -37,11 +77,8 @@ def lookup_schema_node(state: AgentState) -> AgentState:
         
         logger.info(f"Using database: {db_path}")
         
-        # Initialize schema tool
-        schema_tool = SQLiteSchemaLookupTool(db_path)
-        
-        # Get schema
-        schema = schema_tool.get_schema()
+        # Get schema (cached across queries while the database file is unchanged)
+        schema = _get_cached_schema(db_path)
         
         logger.info("Schema lookup completed")
         
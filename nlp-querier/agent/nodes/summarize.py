@@ -1,13 +1,32 @@
 from typing import Dict, Any, List
+import functools
 import logging
+import re
 import pandas as pd
 import numpy as np
 from datetime import datetime
 from agent.tools.summary_tool import SummaryTool
+from agent.tools.sql_gen_tool import get_sql_gen_tool
 from agent.state import AgentState
+from config import get_config
 
 logger = logging.getLogger(__name__)
 
+# Prompt patterns that indicate raw data values leaked into an LLM prompt
+_SUSPICIOUS_PROMPT_PATTERNS = [
+    (pattern, re.compile(pattern))
+    for pattern in [
+        "total=", "sum=", "avg=", "mean=", "date_range=", 
+        r"\d{4}-\d{2}-\d{2}",  # Date pattern
+        r"total \d+",          # Large numbers
+        r"average \d+",        # Specific averages
+    ]
+]
+# Single alternation so a clean prompt is scanned once; the individual patterns only run to report hits
+_SUSPICIOUS_PROMPT_RE = re.compile("|".join(f"(?:{pattern})" for pattern, _ in _SUSPICIOUS_PROMPT_PATTERNS))
+# Metric keys whose large values could be actual data rather than metadata
+_LEAKY_METRIC_KEYS = frozenset({"total", "sum", "average", "mean", "min", "max"})
+
 
 def summarize_node(state: AgentState) -> AgentState:
     """
@@ -64,9 +83,6 @@ def _create_query_summary(question: str, execution_result, sql_query: str) -> st
     Use LLM to explain the SQL query that was generated, providing business context.
     """
     try:
-        from agent.tools.sql_gen_tool import create_sql_gen_tool
-        from config import get_config
-        
         config = get_config()
         if not config or not config.get("ai"):
             logger.warning("⚠️ AI configuration not available, using fallback summary")
@@ -98,7 +114,7 @@ def _create_query_summary(question: str, execution_result, sql_query: str) -> st
         """
         
         # Use Vertex AI for SQL explanation
-        sql_tool = create_sql_gen_tool(
+        sql_tool = get_sql_gen_tool(
             "vertex_ai",
             project_id=config["ai"]["project_id"],
             model_name=config["ai"]["model_name"],
@@ -136,13 +152,14 @@ def _create_query_summary(question: str, execution_result, sql_query: str) -> st
         return ""
 
 
+@functools.lru_cache(maxsize=1024)
 def _create_query_summary_fallback(question: str, sql_query: str, execution_success: bool) -> str:
     """
     Create a detailed fallback SQL explanation when LLM is not available.
+    
+    Pure template over its arguments, so results are memoized for retries and UI re-runs.
     """
     try:
-        import re
-        
         execution_status = "Successfully executed" if execution_success else "Failed to execute"
         
         # Parse the SQL query to identify components
@@ -163,13 +180,14 @@ def _create_query_summary_fallback(question: str, sql_query: str, execution_succ
         select_match = re.search(r'SELECT\s+(.+?)\s+FROM', sql_query, re.IGNORECASE | re.DOTALL)
         if select_match:
             select_clause = select_match.group(1).strip()
-            if 'AVG(' in select_clause.upper():
+            select_upper = select_clause.upper()
+            if 'AVG(' in select_upper:
                 explanation_parts.append(f"| {step}. SELECT | SELECT {select_clause} | Calculates the average values for the specified columns, grouped by the dimensions needed to answer your business question. |")
-            elif 'COUNT(' in select_clause.upper():
+            elif 'COUNT(' in select_upper:
                 explanation_parts.append(f"| {step}. SELECT | SELECT {select_clause} | Counts the number of records that match the specified criteria to provide frequency analysis. |")
-            elif 'SUM(' in select_clause.upper():
+            elif 'SUM(' in select_upper:
                 explanation_parts.append(f"| {step}. SELECT | SELECT {select_clause} | Sums up the total values for the specified columns to provide aggregate totals. |")
-            elif '%' in select_clause or 'PERCENTAGE' in select_clause.upper():
+            elif '%' in select_clause or 'PERCENTAGE' in select_upper:
                 explanation_parts.append(f"| {step}. SELECT | SELECT {select_clause} | Calculates percentage values by comparing counts or amounts between different categories. |")
             else:
                 explanation_parts.append(f"| {step}. SELECT | SELECT {select_clause} | Retrieves the specified columns and performs the necessary calculations to answer your question. |")
@@ -179,11 +197,12 @@ def _create_query_summary_fallback(question: str, sql_query: str, execution_succ
         from_match = re.search(r'FROM\s+(\w+)', sql_query, re.IGNORECASE)
         if from_match:
             table_name = from_match.group(1)
-            if 'fact_transactions' in table_name.lower():
+            table_lower = table_name.lower()
+            if 'fact_transactions' in table_lower:
                 explanation_parts.append(f"| {step}. FROM | FROM {table_name} | Starts with the transaction data table as it contains the core business data needed for the analysis. |")
-            elif 'fact_alerts' in table_name.lower():
+            elif 'fact_alerts' in table_lower:
                 explanation_parts.append(f"| {step}. FROM | FROM {table_name} | Uses the alerts data table as the primary source for compliance and risk analysis. |")
-            elif 'dim_customer' in table_name.lower():
+            elif 'dim_customer' in table_lower:
                 explanation_parts.append(f"| {step}. FROM | FROM {table_name} | Starts with customer dimension data to analyze customer-related metrics. |")
             else:
                 explanation_parts.append(f"| {step}. FROM | FROM {table_name} | Uses the {table_name} table as the primary data source for this analysis. |")
@@ -194,11 +213,12 @@ def _create_query_summary_fallback(question: str, sql_query: str, execution_succ
         for join_match in join_matches:
             table_name = join_match[0]
             join_condition = join_match[1].strip()
-            if 'dim_account' in table_name.lower():
+            table_lower = table_name.lower()
+            if 'dim_account' in table_lower:
                 explanation_parts.append(f"| {step}. JOIN | JOIN {table_name} ON {join_condition} | Connects transaction data to account information to access customer risk segments and account details. |")
-            elif 'dim_customer' in table_name.lower():
+            elif 'dim_customer' in table_lower:
                 explanation_parts.append(f"| {step}. JOIN | JOIN {table_name} ON {join_condition} | Links to customer dimension data to access customer demographics and characteristics. |")
-            elif 'dim_calendar' in table_name.lower():
+            elif 'dim_calendar' in table_lower:
                 explanation_parts.append(f"| {step}. JOIN | JOIN {table_name} ON {join_condition} | Connects to calendar data to enable time-based filtering and analysis by dates, quarters, or years. |")
             else:
                 explanation_parts.append(f"| {step}. JOIN | JOIN {table_name} ON {join_condition} | Joins with {table_name} to access additional data dimensions needed for the analysis. |")
@@ -208,11 +228,12 @@ def _create_query_summary_fallback(question: str, sql_query: str, execution_succ
         where_match = re.search(r'WHERE\s+(.+?)(?:\s+GROUP\s+BY|\s+ORDER\s+BY|\s*$)', sql_query, re.IGNORECASE | re.DOTALL)
         if where_match:
             where_clause = where_match.group(1).strip()
-            if 'risk_segment' in where_clause.lower() and 'high' in where_clause.lower():
+            where_lower = where_clause.lower()
+            if 'risk_segment' in where_lower and 'high' in where_lower:
                 explanation_parts.append(f"| {step}. WHERE | WHERE {where_clause} | Filters to include only high-risk customers by checking the risk segment classification. |")
-            elif 'quarter' in where_clause.lower():
+            elif 'quarter' in where_lower:
                 explanation_parts.append(f"| {step}. WHERE | WHERE {where_clause} | Filters data to the specified quarter using calendar dimension for time-based analysis. |")
-            elif 'year' in where_clause.lower():
+            elif 'year' in where_lower:
                 explanation_parts.append(f"| {step}. WHERE | WHERE {where_clause} | Limits the analysis to the specified year for temporal filtering. |")
             else:
                 explanation_parts.append(f"| {step}. WHERE | WHERE {where_clause} | Applies business filters to focus the analysis on the relevant subset of data. |")
@@ -222,9 +243,10 @@ def _create_query_summary_fallback(question: str, sql_query: str, execution_succ
         groupby_match = re.search(r'GROUP\s+BY\s+(.+?)(?:\s+ORDER\s+BY|\s*$)', sql_query, re.IGNORECASE | re.DOTALL)
         if groupby_match:
             groupby_clause = groupby_match.group(1).strip()
-            if 'channel' in groupby_clause.lower():
+            groupby_lower = groupby_clause.lower()
+            if 'channel' in groupby_lower:
                 explanation_parts.append(f"| {step}. GROUP BY | GROUP BY {groupby_clause} | Groups transactions by channel (Online, ATM, Branch, etc.) to calculate separate metrics for each channel type. |")
-            elif 'country' in groupby_clause.lower():
+            elif 'country' in groupby_lower:
                 explanation_parts.append(f"| {step}. GROUP BY | GROUP BY {groupby_clause} | Groups data by country to provide geographic analysis and regional comparisons. |")
             else:
                 explanation_parts.append(f"| {step}. GROUP BY | GROUP BY {groupby_clause} | Groups the filtered data by {groupby_clause} to enable aggregation calculations for each category. |")
@@ -260,10 +282,6 @@ def _analyze_query_results(question: str, execution_result, sql_query: str) -> D
     """
     Perform intelligent analysis of query results to extract insights.
     """
-    import pandas as pd
-    import numpy as np
-    from datetime import datetime
-    
     insights = {
         "row_count": 0,
         "data_type": "unknown",
@@ -306,22 +324,24 @@ def _analyze_query_results(question: str, execution_result, sql_query: str) -> D
         date_cols = df.select_dtypes(include=['datetime']).columns.tolist()
         
         # Key metrics analysis - PRIVACY COMPLIANT: Only statistical aggregates, no actual data
+        # One aggregation pass over all numeric columns instead of a dropna/mean/std per column
+        numeric_stats = df[numeric_cols].agg(["count", "mean", "std"]) if numeric_cols else None
         for col in numeric_cols:
             # Calculate statistical metadata without storing actual values
-            col_data = df[col].dropna()
-            if len(col_data) > 0:
+            non_null_count = int(numeric_stats.at["count", col])
+            if non_null_count > 0:
                 insights["key_metrics"][col] = {
-                    "count": int(len(col_data)),
+                    "count": non_null_count,
                     "has_data": True,
                     "data_type": "numeric",
                     "statistical_range": "calculated",  # Don't store actual min/max
-                    "completeness": f"{(len(col_data) / len(df)) * 100:.1f}%"
+                    "completeness": f"{(non_null_count / len(df)) * 100:.1f}%"
                 }
                 
                 # Only store variability indicators, not actual statistical values
-                if len(col_data) > 1:
-                    mean_val = float(col_data.mean())
-                    std_val = float(col_data.std()) if len(col_data) > 1 else 0
+                if non_null_count > 1:
+                    mean_val = float(numeric_stats.at["mean", col])
+                    std_val = float(numeric_stats.at["std", col])
                     cv = (std_val / mean_val * 100) if mean_val > 0 else 0
                     
                     # Store variability classification, not actual coefficient
@@ -353,9 +373,10 @@ def _analyze_query_results(question: str, execution_result, sql_query: str) -> D
             insights["time_context"] = _analyze_time_patterns(df, date_cols)
         
         # Data quality insights
+        null_counts = df.isnull().sum()
         insights["data_quality"] = {
-            "completeness": f"{(1 - df.isnull().sum().sum() / (len(df) * len(df.columns))) * 100:.1f}%",
-            "missing_data": df.isnull().sum().to_dict() if df.isnull().sum().any() else None
+            "completeness": f"{(1 - null_counts.sum() / (len(df) * len(df.columns))) * 100:.1f}%",
+            "missing_data": null_counts.to_dict() if null_counts.any() else None
         }
         
         # Anomaly detection for numeric data
@@ -458,9 +479,9 @@ def _audit_privacy_compliance(insights: Dict[str, Any], prompt: str) -> bool:
         for col, stats in insights["key_metrics"].items():
             # Look for suspicious numeric values that might be actual data
             for key, value in stats.items():
-                if isinstance(value, (int, float)) and key not in ["count"] and value > 100:
+                if isinstance(value, (int, float)) and key != "count" and value > 100:
                     # Large numbers might be actual data values
-                    if key in ["total", "sum", "average", "mean", "min", "max"]:
+                    if key in _LEAKY_METRIC_KEYS:
                         privacy_violations.append(f"Potential data leak: {key} value for {col}")
     
     # Check time_context for actual dates
@@ -473,17 +494,10 @@ def _audit_privacy_compliance(insights: Dict[str, Any], prompt: str) -> bool:
     
     # Check prompt for data patterns
     prompt_lower = prompt.lower()
-    suspicious_patterns = [
-        "total=", "sum=", "avg=", "mean=", "date_range=", 
-        r"\d{4}-\d{2}-\d{2}",  # Date pattern
-        r"total \d+",          # Large numbers
-        r"average \d+",        # Specific averages
-    ]
-    
-    import re
-    for pattern in suspicious_patterns:
-        if re.search(pattern, prompt_lower):
-            privacy_violations.append(f"Suspicious pattern in prompt: {pattern}")
+    if _SUSPICIOUS_PROMPT_RE.search(prompt_lower):
+        for pattern, compiled in _SUSPICIOUS_PROMPT_PATTERNS:
+            if compiled.search(prompt_lower):
+                privacy_violations.append(f"Suspicious pattern in prompt: {pattern}")
     
     # Log any violations
     if privacy_violations:
@@ -688,8 +702,6 @@ def _post_process_summary(summary: str, insights: Dict[str, Any]) -> str:
     """
     Post-process the summary to ensure quality and consistency.
     """
-    import re
-    
     # Remove any JSON formatting that might have leaked through
     summary = re.sub(r'[{}":]', '', summary)
     
@@ -44,11 +44,11 @@ def validate_sql_node(state: AgentState) -> AgentState:
             new_state['validation_error'] = "No SQL to validate"
             return new_state
 
-        logger.info("📝 SQL to validate:")
-        for i, line in enumerate(generated_sql.split('\n')[:10], 1):  # First 10 lines
-            logger.info(f"    {i:2d}: {line}")
-        if len(generated_sql.split('\n')) > 10:
-            logger.info("    ... (truncated)")
+        sql_lines = generated_sql.split('\n')
+        numbered_sql = "\n".join(f"    {i:2d}: {line}" for i, line in enumerate(sql_lines[:10], 1))  # First 10 lines
+        if len(sql_lines) > 10:
+            numbered_sql += "\n    ... (truncated)"
+        logger.info(f"📝 SQL to validate:\n{numbered_sql}")
 
         # Get database connection for schema validation
         logger.info("🔧 Setting up database connection for schema validation...")
@@ -0,0 +1,134 @@
+"""
+Query result cache for the Analytics Agent.
+
+Stores completed workflow results keyed by the normalized question and the
+conversation history it was asked in, so repeating a question skips the LLM
+calls and SQL execution entirely.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+QUERY_CACHE_TTL_SECONDS = 3600
+QUERY_CACHE_MAX_ENTRIES = 256
+# Questions longer than this are not cached
+QUERY_CACHE_MAX_QUESTION_CHARS = 2048
+# Result rows kept per entry; the UI shows no more than this and reads the full size from 'shape'
+QUERY_CACHE_MAX_RESULT_ROWS = 50
+
+_QUERY_CACHE: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+# Agent runs execute on worker threads, so every OrderedDict operation holds this lock
+_QUERY_CACHE_LOCK = threading.Lock()
+_WHITESPACE_RE = re.compile(r'\s+')
+_TRAILING_PUNCTUATION_RE = re.compile(r'[\s?.!;]+$')
+
+
+def is_enabled() -> bool:
+    """Return False when the cache is switched off with QUERY_CACHE_DISABLED=1 (e.g. for freshness tests)."""
+    return os.getenv("QUERY_CACHE_DISABLED", "").lower() not in ("1", "true", "yes")
+
+
+def normalize_question(question: str) -> str:
+    """
+    Canonicalize a question for cache lookups.
+
+    Only case, whitespace and trailing sentence punctuation are folded; word order
+    and operators are kept because they change the meaning of an analytics query.
+
+    Args:
+        question: User's natural language question
+
+    Returns:
+        Normalized question text
+    """
+    text = _WHITESPACE_RE.sub(' ', question.strip().casefold())
+    return _TRAILING_PUNCTUATION_RE.sub('', text)
+
+
+def make_key(question: str, history: List[Dict[str, str]]) -> Optional[str]:
+    """
+    Build the cache key from the normalized question and the conversation it follows.
+
+    Keys are the first 16 hex digits (64 bits) of a SHA-256 digest; with at most
+    QUERY_CACHE_MAX_ENTRIES live entries the chance of a collision is negligible.
+
+    Args:
+        question: User's natural language question
+        history: Conversation history the question is asked in
+
+    Returns:
+        Cache key, or None if the question is too long to be worth caching
+    """
+    if len(question) > QUERY_CACHE_MAX_QUESTION_CHARS:
+        return None
+
+    history_text = json.dumps(history, sort_keys=True, default=str)
+    payload = f"{normalize_question(question)}\x00{history_text}"
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def get(key: str) -> Optional[Dict[str, Any]]:
+    """
+    Look up a cached result.
+
+    Args:
+        key: Cache key from make_key
+
+    Returns:
+        A copy of the cached result, or None on a miss or expired entry
+    """
+    with _QUERY_CACHE_LOCK:
+        cached = _QUERY_CACHE.get(key)
+        if cached is None:
+            return None
+
+        stored_at, result = cached
+        if time.monotonic() - stored_at > QUERY_CACHE_TTL_SECONDS:
+            del _QUERY_CACHE[key]
+            return None
+
+        _QUERY_CACHE.move_to_end(key)
+        return dict(result)
+
+
+def put(key: str, result: Dict[str, Any]) -> None:
+    """
+    Store a completed result, evicting the least recently used entry when full.
+
+    Result records beyond QUERY_CACHE_MAX_RESULT_ROWS are dropped so each entry
+    stays small; the original 'shape' still reports the full row count.
+
+    Args:
+        key: Cache key from make_key
+        result: Workflow result dictionary
+    """
+    result = dict(result)
+    execution_result = result.get("execution_result")
+    if isinstance(execution_result, dict):
+        data = execution_result.get("data")
+        if isinstance(data, list) and len(data) > QUERY_CACHE_MAX_RESULT_ROWS:
+            result["execution_result"] = {
+                **execution_result,
+                "data": data[:QUERY_CACHE_MAX_RESULT_ROWS],
+                "truncated": True
+            }
+
+    with _QUERY_CACHE_LOCK:
+        _QUERY_CACHE[key] = (time.monotonic(), result)
+        _QUERY_CACHE.move_to_end(key)
+        while len(_QUERY_CACHE) > QUERY_CACHE_MAX_ENTRIES:
+            _QUERY_CACHE.popitem(last=False)
+
+
+def clear() -> None:
+    """Drop every cached result."""
+    with _QUERY_CACHE_LOCK:
+        _QUERY_CACHE.clear()
@@ -1,6 +1,8 @@
 from typing import Any, Dict
 import logging
 import json
+from agent.tools.sql_gen_tool import get_sql_gen_tool
+from config import get_config
 
 class SQLErrorFixTool:
     def __init__(self, max_retries: int = 3):
@@ -40,9 +42,6 @@ class SQLErrorFixTool:
         Use LLM to intelligently fix SQL errors.
         """
         try:
-            from agent.tools.sql_gen_tool import create_sql_gen_tool
-            from config import get_config
-            
             config = get_config()
             
             fix_prompt = f"""Fix this SQL query that has an error.
@@ -74,7 +73,7 @@ Respond with JSON:
 {{"fixed_sql": "SELECT ...", "explanation": "What was fixed"}}"""
 
             # Use Vertex AI to fix the SQL
-            sql_tool = create_sql_gen_tool(
+            sql_tool = get_sql_gen_tool(
                 "vertex_ai",
                 project_id=config["ai"]["project_id"],
                 model_name=config["ai"]["model_name"],
@@ -1,18 +1,101 @@
 """
 Results Interpreter Tool - Generate business insights from query results
 """
+import hashlib
+import json
 import logging
-from typing import Dict, Any, List, Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
 import pandas as pd
-from agent.tools.sql_gen_tool import create_sql_gen_tool
+from pandas.api.types import is_bool_dtype, is_numeric_dtype, is_string_dtype
+from agent.tools.sql_gen_tool import get_sql_gen_tool
 import config
 from utils.pii_redactor import get_pii_redactor
 
 logger = logging.getLogger(__name__)
 
+INTERPRETATION_MODEL = 'gemini-2.5-flash'
+# Bump when the interpretation prompt changes so cached interpretations are not reused
+INTERPRETATION_PROMPT_VERSION = 2
+
+# Exact-match cache of LLM interpretations keyed by a hash of model, prompt version and prompt.
+# The prompt embeds the question, SQL and redacted results; the optional context argument is not sent
+# to the model, so the prompt alone determines the output.
+_INTERPRETATION_CACHE: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+# Interpretations run on agent worker threads, so every OrderedDict operation holds this lock
+_INTERPRETATION_CACHE_LOCK = threading.Lock()
+_INTERPRETATION_CACHE_TTL_SECONDS = 3600
+_INTERPRETATION_CACHE_MAX_ENTRIES = 256
+
+
+def _is_text_column(series: pd.Series) -> bool:
+    """Treat object, string and categorical columns alike so narrowed dtypes are still summarised."""
+    return series.dtype == 'object' or is_string_dtype(series) or isinstance(series.dtype, pd.CategoricalDtype)
+
+
+def _strip_code_fence(text: str) -> str:
+    """Remove a ```json or ``` markdown fence the LLM may wrap its JSON answer in."""
+    cleaned = text.strip()
+    for fence in ('```json', '```'):
+        if cleaned.startswith(fence):
+            cleaned = cleaned[len(fence):]
+            if cleaned.endswith('```'):
+                cleaned = cleaned[:-3]
+            return cleaned.strip()
+    return cleaned
+
+
+def _is_valid_interpretation(text: str) -> bool:
+    """Return True if the LLM answer parses as the JSON object interpret_results formats."""
+    try:
+        return isinstance(json.loads(_strip_code_fence(text)), dict)
+    except json.JSONDecodeError:
+        return False
+
+
 class ResultsInterpreterTool:
     """Tool for generating business insights from SQL query results using LLM."""
     
+    # Instructions shared by every interpretation request. Kept as one constant prefix ahead of the
+    # query-specific details so the provider can reuse its cached prompt prefix across calls.
+    _STATIC_PROMPT_PREFIX = """You are a senior business analyst specializing in financial crime and fraud prevention. 
+Your task is to analyze the provided SQL query results  in a structured executive summary format.
+
+**IMPORTANT CONTEXT: DATA PRIVACY & REDACTION**
+- The query results you are seeing have been intentionally redacted for security and privacy.
+- You will see placeholders like `[XXX_REDACTED]`. This is NOT a data quality issue.
+- **Your primary directive is to IGNORE the redacted fields completely.**
+- **DO NOT mention the redaction or data quality in your analysis.**
+- Base your entire analysis ONLY on the visible, non-redacted data (e.g., counts, dates, risk levels, channels, amounts).
+
+**CRITICAL REQUIREMENTS:**
+1.  **Focus ONLY on the actual, visible data** - do not mention redaction.
+2.  Return your response in the specified JSON format.
+3.  Provide concise, actionable analysis using specific numbers from the visible data.
+4.  Identify trends, anomalies, and patterns from the non-sensitive metrics.
+
+**REQUIRED JSON OUTPUT FORMAT:**
+{
+    "executive_summary": "A 2-3 sentence summary of the main findings based on the visible data.",
+    "key_findings": [
+        {
+            "finding_title": "A clear title for the finding (e.g., 'Spike in High-Risk Alerts in Q4')",
+            "description": "A detailed explanation using specific, non-redacted data points from the results (e.g., 'The number of high-risk alerts increased from 50 in Q3 to 85 in Q4, a 70% increase.')",
+            "business_impact": "Why this finding matters for fraud prevention, operational efficiency, or risk management."
+        }
+    ]
+}
+
+**ANALYSIS INSTRUCTIONS:**
+- Write in the style of a professional, executive-level briefing.
+- Use specific numbers, percentages, and trends from the actual, visible results.
+- Your entire analysis must be derived from the non-sensitive data provided.
+- Generate the complete JSON object and nothing else. Ensure it is valid.
+
+"""
+    
     def __init__(self):
         """Initialize the results interpreter tool."""
         self.logger = logging.getLogger(__name__)
@@ -55,25 +138,12 @@ class ResultsInterpreterTool:
             
             # Try to parse as JSON first, fall back to raw text
             try:
-                import json
                 self.logger.info("🔍 Attempting JSON parsing...")
                 
                 # Clean the interpretation text - remove markdown code blocks if present
-                cleaned_interpretation = interpretation.strip()
-                if cleaned_interpretation.startswith('```json'):
-                    # Remove ```json at the start and ``` at the end
-                    cleaned_interpretation = cleaned_interpretation[7:]  # Remove ```json
-                    if cleaned_interpretation.endswith('```'):
-                        cleaned_interpretation = cleaned_interpretation[:-3]  # Remove ```
-                    cleaned_interpretation = cleaned_interpretation.strip()
+                cleaned_interpretation = _strip_code_fence(interpretation)
+                if interpretation.strip().startswith('```'):
                     self.logger.info("🧹 Cleaned markdown code blocks from LLM response")
-                elif cleaned_interpretation.startswith('```'):
-                    # Remove ``` at the start and end
-                    cleaned_interpretation = cleaned_interpretation[3:]  # Remove ```
-                    if cleaned_interpretation.endswith('```'):
-                        cleaned_interpretation = cleaned_interpretation[:-3]  # Remove ```
-                    cleaned_interpretation = cleaned_interpretation.strip()
-                    self.logger.info("🧹 Cleaned generic markdown code blocks from LLM response")
                 
                 self.logger.info(f"🔍 Cleaned interpretation preview: {cleaned_interpretation[:200]}...")
                 
@@ -134,7 +204,7 @@ class ResultsInterpreterTool:
         
         for col in display_df.columns:
             # Check if column contains mostly redacted values
-            if display_df[col].dtype == 'object':
+            if _is_text_column(display_df[col]):
                 sample_values = display_df[col].dropna().astype(str).head(5)
                 redacted_count = sum(1 for val in sample_values if 'REDACTED' in val)
                 if redacted_count > len(sample_values) * 0.5:  # More than 50% redacted
@@ -160,7 +230,10 @@ class ResultsInterpreterTool:
             result_text += f"📝 Note: {len(redacted_columns)} columns contain privacy-protected data (ignore these): {', '.join(redacted_columns)}\n\n"
         
         # Add summary statistics for numeric columns
-        numeric_cols = [col for col in business_columns if display_df[col].dtype in ['int64', 'float64']]
+        numeric_cols = [
+            col for col in business_columns
+            if is_numeric_dtype(display_df[col]) and not is_bool_dtype(display_df[col])
+        ]
         if numeric_cols:
             result_text += "📈 SUMMARY STATISTICS:\n"
             for col in numeric_cols:
@@ -171,7 +244,7 @@ class ResultsInterpreterTool:
             result_text += "\n"
         
         # Add categorical summaries
-        categorical_cols = [col for col in business_columns if display_df[col].dtype == 'object' and col not in redacted_columns]
+        categorical_cols = [col for col in business_columns if _is_text_column(display_df[col]) and col not in redacted_columns]
         if categorical_cols:
             result_text += "📋 CATEGORY DISTRIBUTIONS:\n"
             for col in categorical_cols[:3]:  # Limit to top 3 categorical columns
@@ -249,47 +322,14 @@ class ResultsInterpreterTool:
     def _create_interpretation_prompt(self, question: str, sql_query: str, results_text: str, context: str = None) -> str:
         """Create a more robust prompt for business interpretation that handles redaction."""
         
-        prompt = f"""You are a senior business analyst specializing in financial crime and fraud prevention. 
-Your task is to analyze the provided SQL query results  in a structured executive summary format.
-
-**IMPORTANT CONTEXT: DATA PRIVACY & REDACTION**
-- The query results you are seeing have been intentionally redacted for security and privacy.
-- You will see placeholders like `[XXX_REDACTED]`. This is NOT a data quality issue.
-- **Your primary directive is to IGNORE the redacted fields completely.**
-- **DO NOT mention the redaction or data quality in your analysis.**
-- Base your entire analysis ONLY on the visible, non-redacted data (e.g., counts, dates, risk levels, channels, amounts).
-
-**CRITICAL REQUIREMENTS:**
-1.  **Focus ONLY on the actual, visible data** - do not mention redaction.
-2.  Return your response in the specified JSON format.
-3.  Provide concise, actionable analysis using specific numbers from the visible data.
-4.  Identify trends, anomalies, and patterns from the non-sensitive metrics.
-
-**QUERY CONTEXT:**
+        # Only the query-specific suffix is built per call; the shared instructions come first
+        prompt = self._STATIC_PROMPT_PREFIX + f"""**QUERY CONTEXT:**
 - User's Business Question: "{question}"
 - Executed SQL Query: "{sql_query}"
 
 **ACTUAL QUERY RESULTS (with intentional redaction):**
 {results_text}
 
-**REQUIRED JSON OUTPUT FORMAT:**
-{{
-    "executive_summary": "A 2-3 sentence summary of the main findings based on the visible data.",
-    "key_findings": [
-        {{
-            "finding_title": "A clear title for the finding (e.g., 'Spike in High-Risk Alerts in Q4')",
-            "description": "A detailed explanation using specific, non-redacted data points from the results (e.g., 'The number of high-risk alerts increased from 50 in Q3 to 85 in Q4, a 70% increase.')",
-            "business_impact": "Why this finding matters for fraud prevention, operational efficiency, or risk management."
-        }}
-    ]
-}}
-
-**ANALYSIS INSTRUCTIONS:**
-- Write in the style of a professional, executive-level briefing.
-- Use specific numbers, percentages, and trends from the actual, visible results.
-- Your entire analysis must be derived from the non-sensitive data provided.
-- Generate the complete JSON object and nothing else. Ensure it is valid.
-
 Generate your concise JSON analysis based *only* on the visible query results:"""
 
         return prompt
@@ -343,14 +383,29 @@ Generate your concise JSON analysis based *only* on the visible query results:""
     def _get_llm_interpretation(self, prompt: str) -> str:
         """Get interpretation from LLM."""
         try:
+            cache_key = hashlib.sha256(
+                f"{INTERPRETATION_MODEL}\n{INTERPRETATION_PROMPT_VERSION}\n{prompt}".encode("utf-8")
+            ).hexdigest()
+            with _INTERPRETATION_CACHE_LOCK:
+                cached = _INTERPRETATION_CACHE.get(cache_key)
+                if cached is not None:
+                    cached_at, cached_interpretation = cached
+                    if time.monotonic() - cached_at < _INTERPRETATION_CACHE_TTL_SECONDS:
+                        _INTERPRETATION_CACHE.move_to_end(cache_key)
+                    else:
+                        del _INTERPRETATION_CACHE[cache_key]
+                        cached = None
+            if cached is not None:
+                self.logger.info(f"⚡ Using cached LLM interpretation ({len(cached_interpretation)} characters)")
+                return cached_interpretation
+            
             # Use the same SQL generation tool for LLM access
-            from config import get_config
-            config_data = get_config()
+            config_data = config.get_config()
             
-            sql_tool = create_sql_gen_tool(
+            sql_tool = get_sql_gen_tool(
                 "vertex_ai",
                 project_id=config_data["ai"]["project_id"],
-                model_name='gemini-2.5-flash',#config_data["ai"]["model_name"],#'gemini-2.5-flash'
+                model_name=INTERPRETATION_MODEL,#config_data["ai"]["model_name"],#'gemini-2.5-flash'
                 temperature=0.7  # Higher temperature for more creative business insights
             )
             
@@ -372,6 +427,17 @@ Generate your concise JSON analysis based *only* on the visible query results:""
             self.logger.info(interpretation)
             self.logger.info("=" * 80)
             
+            # Empty, truncated or malformed answers are returned but not cached, so the next run retries
+            if not _is_valid_interpretation(interpretation):
+                self.logger.warning("⚠️ LLM interpretation is not the expected JSON object; not caching it")
+                return interpretation
+            
+            with _INTERPRETATION_CACHE_LOCK:
+                _INTERPRETATION_CACHE[cache_key] = (time.monotonic(), interpretation)
+                _INTERPRETATION_CACHE.move_to_end(cache_key)
+                while len(_INTERPRETATION_CACHE) > _INTERPRETATION_CACHE_MAX_ENTRIES:
+                    _INTERPRETATION_CACHE.popitem(last=False)
+            
             return interpretation
             
         except Exception as e:
@@ -5,6 +5,8 @@ This tool executes SQL queries against different database systems including
 BigQuery, PostgreSQL, and SQLite with proper error handling and result formatting.
 """
 from typing import Any, Dict, Optional, Union
+import functools
+import threading
 import pandas as pd
 import logging
 from abc import ABC, abstractmethod
@@ -150,13 +152,17 @@ class PostgreSQLExecutorTool(SQLExecutorTool):
         """
         self.connection_string = connection_string
         self._connection = None
+        self._lock = threading.Lock()
     
     def _get_connection(self):
         """Get database connection, creating if needed."""
-        if self._connection is None:
+        if self._connection is None or self._connection.closed:
             try:
                 import psycopg2
                 self._connection = psycopg2.connect(self.connection_string)
+                # Queries are read-only; autocommit keeps the reused connection from
+                # sitting idle in a transaction that holds its snapshot and locks
+                self._connection.autocommit = True
             except ImportError:
                 raise ImportError("psycopg2 is required for PostgreSQL connections")
             except Exception as e:
@@ -175,8 +181,19 @@ class PostgreSQLExecutorTool(SQLExecutorTool):
                     "error": "Modification queries are not allowed"
                 }
             
-            conn = self._get_connection()
-            df = pd.read_sql_query(sql, conn)
+            # The shared executor is used from several worker threads; one query runs at a time
+            with self._lock:
+                try:
+                    conn = self._get_connection()
+                    df = pd.read_sql_query(sql, conn)
+                except Exception:
+                    # Reset the connection after a failure; if that fails too, reconnect on the next query
+                    if self._connection is not None and not self._connection.closed:
+                        try:
+                            self._connection.rollback()
+                        except Exception:
+                            self._connection = None
+                    raise
             
             logger.info(f"PostgreSQL query completed. Rows returned: {len(df)}")
             
@@ -208,13 +225,16 @@ class SQLiteExecutorTool(SQLExecutorTool):
         """
         self.database_path = database_path
         self._connection = None
+        self._lock = threading.Lock()
     
     def _get_connection(self):
         """Get database connection, creating if needed."""
         if self._connection is None:
             try:
                 import sqlite3
-                self._connection = sqlite3.connect(self.database_path)
+                # The shared executor is used from whichever thread serves the request;
+                # queries are serialized by self._lock instead of sqlite3's thread check
+                self._connection = sqlite3.connect(self.database_path, check_same_thread=False)
             except Exception as e:
                 logger.error(f"Failed to connect to SQLite: {e}")
                 raise
@@ -231,8 +251,9 @@ class SQLiteExecutorTool(SQLExecutorTool):
                     "error": "Modification queries are not allowed"
                 }
             
-            conn = self._get_connection()
-            df = pd.read_sql_query(sql, conn)
+            with self._lock:
+                conn = self._get_connection()
+                df = pd.read_sql_query(sql, conn)
             
             logger.info(f"SQLite query completed. Rows returned: {len(df)}")
             
@@ -290,6 +311,24 @@ def create_sql_executor_tool(db_type: str = "postgresql", **kwargs) -> SQLExecut
         raise ValueError(f"Unsupported database type: {db_type}")
 
 
+@functools.lru_cache(maxsize=8)
+def get_sql_executor_tool(db_type: str = "postgresql", **kwargs) -> SQLExecutorTool:
+    """
+    Get a shared SQL executor tool for the given configuration.
+    
+    Executors hold their database connection open, so one instance per (type, parameters)
+    is reused across queries instead of reconnecting for every execution.
+    
+    Args:
+        db_type: Type of database ("postgresql" or "sqlite")
+        **kwargs: Database-specific connection parameters (must be hashable)
+        
+    Returns:
+        Cached SQL executor tool instance
+    """
+    return create_sql_executor_tool(db_type, **kwargs)
+
+
 # Example usage configurations:
 #
 # For PostgreSQL:
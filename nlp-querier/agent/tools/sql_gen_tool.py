@@ -5,6 +5,7 @@ This tool converts natural language queries into SQL statements using
 conversation context and database schema information.
 """
 from typing import Dict, List, Optional, Any
+import functools
 import json
 import logging
 import re
@@ -13,8 +14,70 @@ from abc import ABC, abstractmethod
 import vertexai
 from vertexai.generative_models import GenerativeModel
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Regexes used while extracting SQL from LLM responses, compiled once at import
+_MARKDOWN_FENCE_PATTERNS = [
+    re.compile(r'^```json\s*', re.MULTILINE | re.IGNORECASE),
+    re.compile(r'^```\s*', re.MULTILINE),
+    re.compile(r'\s*```$', re.MULTILINE),
+    re.compile(r'^\s*```json\s*', re.IGNORECASE),
+    re.compile(r'\s*```\s*$'),
+]
+_TEXT_SQL_BLOCK_PATTERNS = [re.compile(p, re.DOTALL | re.IGNORECASE) for p in [
+    r'```sql\s*(.*?)\s*```',
+    r'```\s*(SELECT.*?(?:;|\Z))\s*```',
+    r'SQL[:\s]*`(.*?)`',
+    r'Query[:\s]*`(.*?)`',
+]]
+_TEXT_SELECT_PATTERN = re.compile(r'(SELECT\b.*?)(?:\n\n|\Z|;)', re.DOTALL | re.IGNORECASE)
+_TEXT_JSON_LIKE_PATTERN = re.compile(r'"sql"\s*:\s*"(.*?)"', re.DOTALL | re.IGNORECASE)
+
+_RESPONSE_MARKDOWN_JSON_PATTERNS = [re.compile(p, re.DOTALL | re.IGNORECASE) for p in [
+    r'```json\s*(\{.*?\})\s*```',          # ```json {...} ```
+    r'```\s*(\{.*?\})\s*```',              # ``` {...} ```
+    r'```json\s*(\{[^`]*?\})\s*```',       # More permissive JSON in markdown
+    r'```\s*(\{[^`]*?\})\s*```',           # More permissive generic markdown
+]]
+_RESPONSE_JSON_KEY_PATTERNS = [re.compile(p, re.DOTALL | re.IGNORECASE) for p in [
+    r'(\{[^{}]*"sql"[^{}]*"[^"]*"[^{}]*\})',                    # Simple SQL key detection
+    r'(\{[^{}]*"query"[^{}]*"[^"]*"[^{}]*\})',                  # Simple query key detection
+    r'(\{[^{}]*"sql"\s*:\s*"[^"]*SELECT[^"]*"[^{}]*\})',        # SQL with SELECT keyword
+    r'(\{[^{}]*"query"\s*:\s*"[^"]*SELECT[^"]*"[^{}]*\})',      # Query with SELECT keyword
+    r'(\{.*?"sql"\s*:\s*".*?".*?\})',                          # Flexible SQL key
+    r'(\{.*?"query"\s*:\s*".*?".*?\})',                        # Flexible query key
+]]
+_RESPONSE_SQL_BLOCK_PATTERNS = [re.compile(p, re.DOTALL | re.IGNORECASE) for p in [
+    r'```sql\s*(.*?)\s*```',                    # SQL code blocks
+    r'```\s*(SELECT.*?)\s*```',                 # Generic SELECT blocks
+    r'```sql\s*(SELECT.*?)```',                 # SQL with SELECT (no end whitespace)
+    r'```\s*(WITH.*?SELECT.*?)\s*```',          # CTE queries
+]]
+_RESPONSE_RAW_SQL_PATTERNS = [re.compile(p, re.DOTALL | re.IGNORECASE) for p in [
+    r'(SELECT\s+(?:[^;])+?)(?:\s*[;}]|\s*$)',               # Complete SELECT statements
+    r'(WITH\s+.+?SELECT\s+(?:[^;])+?)(?:\s*[;}]|\s*$)',     # CTE queries
+    r'(SELECT\s+.+?FROM\s+.+?)(?:\n\s*\n|\s*$|;)',          # SELECT...FROM with end detection
+]]
+_RESPONSE_MALFORMED_JSON_PATTERNS = [re.compile(p, re.DOTALL | re.IGNORECASE) for p in [
+    r'"sql"\s*:\s*"([^"]*)"',                   # Extract SQL value from malformed JSON
+    r'"query"\s*:\s*"([^"]*)"',                 # Extract query value from malformed JSON
+    r"'sql'\s*:\s*'([^']*)'",                   # Single quotes variant
+    r"'query'\s*:\s*'([^']*)'",                 # Single quotes query variant
+]]
+
+
+def _loads_json(text: str) -> Any:
+    """Parse a JSON document with orjson when installed, falling back to the stdlib json module."""
+    if orjson is not None:
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers keep catching the stdlib type
+        return orjson.loads(text)
+    return json.loads(text)
+
 
 class SQLGenTool(ABC):
     """
@@ -210,11 +273,8 @@ Response format:
             cleaned_text = content.strip()
             
             # Remove common markdown artifacts that interfere with parsing
-            cleaned_text = re.sub(r'^```json\s*', '', cleaned_text, flags=re.MULTILINE | re.IGNORECASE)
-            cleaned_text = re.sub(r'^```\s*', '', cleaned_text, flags=re.MULTILINE)
-            cleaned_text = re.sub(r'\s*```$', '', cleaned_text, flags=re.MULTILINE)
-            cleaned_text = re.sub(r'^\s*```json\s*', '', cleaned_text, flags=re.IGNORECASE)
-            cleaned_text = re.sub(r'\s*```\s*$', '', cleaned_text)
+            for fence_pattern in _MARKDOWN_FENCE_PATTERNS:
+                cleaned_text = fence_pattern.sub('', cleaned_text)
             
             logger.info(f"🧹 PARSING - Cleaned text length: {len(cleaned_text)} characters")
             
@@ -239,15 +299,8 @@ Response format:
                 pass
             
             # STRATEGY 2: JSON extraction from markdown code blocks
-            markdown_patterns = [
-                r'```json\s*(\{.*?\})\s*```',          # ```json {...} ```
-                r'```\s*(\{.*?\})\s*```',              # ``` {...} ```
-                r'```json\s*(\{[^`]*?\})\s*```',       # More permissive JSON in markdown
-                r'```\s*(\{[^`]*?\})\s*```',           # More permissive generic markdown
-            ]
-            
-            for i, pattern in enumerate(markdown_patterns):
-                matches = re.findall(pattern, content, re.DOTALL | re.IGNORECASE)
+            for i, pattern in enumerate(_RESPONSE_MARKDOWN_JSON_PATTERNS):
+                matches = pattern.findall(content)
                 for match in matches:
                     json_str = match.strip()
                     if json_str:
@@ -266,17 +319,8 @@ Response format:
                             continue
             
             # STRATEGY 3: Regex-based JSON extraction with SQL key detection
-            json_patterns = [
-                r'(\{[^{}]*"sql"[^{}]*"[^"]*"[^{}]*\})',                    # Simple SQL key detection
-                r'(\{[^{}]*"query"[^{}]*"[^"]*"[^{}]*\})',                  # Simple query key detection  
-                r'(\{[^{}]*"sql"\s*:\s*"[^"]*SELECT[^"]*"[^{}]*\})',        # SQL with SELECT keyword
-                r'(\{[^{}]*"query"\s*:\s*"[^"]*SELECT[^"]*"[^{}]*\})',      # Query with SELECT keyword
-                r'(\{.*?"sql"\s*:\s*".*?".*?\})',                          # Flexible SQL key
-                r'(\{.*?"query"\s*:\s*".*?".*?\})',                        # Flexible query key
-            ]
-            
-            for i, pattern in enumerate(json_patterns):
-                matches = re.findall(pattern, content, re.DOTALL | re.IGNORECASE)
+            for i, pattern in enumerate(_RESPONSE_JSON_KEY_PATTERNS):
+                matches = pattern.findall(content)
                 for match in matches:
                     if match.strip():
                         try:
@@ -320,15 +364,8 @@ Response format:
                             continue
             
             # STRATEGY 5: SQL extraction from code blocks
-            sql_block_patterns = [
-                r'```sql\s*(.*?)\s*```',                    # SQL code blocks
-                r'```\s*(SELECT.*?)\s*```',                 # Generic SELECT blocks
-                r'```sql\s*(SELECT.*?)```',                 # SQL with SELECT (no end whitespace)
-                r'```\s*(WITH.*?SELECT.*?)\s*```',          # CTE queries
-            ]
-            
-            for i, pattern in enumerate(sql_block_patterns):
-                matches = re.findall(pattern, content, re.DOTALL | re.IGNORECASE)
+            for i, pattern in enumerate(_RESPONSE_SQL_BLOCK_PATTERNS):
+                matches = pattern.findall(content)
                 for match in matches:
                     sql = match.strip()
                     if sql and sql.upper().startswith(('SELECT', 'WITH')):
@@ -339,14 +376,8 @@ Response format:
                         }
             
             # STRATEGY 6: Raw SQL detection with SELECT statement patterns
-            raw_sql_patterns = [
-                r'(SELECT\s+(?:[^;])+?)(?:\s*[;}]|\s*$)',               # Complete SELECT statements
-                r'(WITH\s+.+?SELECT\s+(?:[^;])+?)(?:\s*[;}]|\s*$)',     # CTE queries
-                r'(SELECT\s+.+?FROM\s+.+?)(?:\n\s*\n|\s*$|;)',          # SELECT...FROM with end detection
-            ]
-            
-            for i, pattern in enumerate(raw_sql_patterns):
-                matches = re.findall(pattern, content, re.DOTALL | re.IGNORECASE)
+            for i, pattern in enumerate(_RESPONSE_RAW_SQL_PATTERNS):
+                matches = pattern.findall(content)
                 for match in matches:
                     sql = match.strip().rstrip(';')
                     # Validate it's a substantial SQL query
@@ -360,15 +391,8 @@ Response format:
                         }
             
             # STRATEGY 7: Malformed JSON repair and extraction
-            malformed_patterns = [
-                r'"sql"\s*:\s*"([^"]*)"',                   # Extract SQL value from malformed JSON
-                r'"query"\s*:\s*"([^"]*)"',                 # Extract query value from malformed JSON
-                r"'sql'\s*:\s*'([^']*)'",                   # Single quotes variant
-                r"'query'\s*:\s*'([^']*)'",                 # Single quotes query variant
-            ]
-            
-            for i, pattern in enumerate(malformed_patterns):
-                matches = re.findall(pattern, content, re.DOTALL | re.IGNORECASE)
+            for i, pattern in enumerate(_RESPONSE_MALFORMED_JSON_PATTERNS):
+                matches = pattern.findall(content)
                 for match in matches:
                     sql = match.strip().replace('\\n', '\n').replace('\\"', '"').replace("\\'", "'")
                     if sql and sql.upper().startswith(('SELECT', 'WITH')):
@@ -436,16 +460,14 @@ Response format:
         - Plain SQL queries
         """
         try:
+            # Every pattern below only accepts SQL starting with SELECT, so a response without
+            # the keyword (typical for refusals and error replies) can skip all regex scans
+            if 'select' not in text.lower():
+                return {'sql': '', 'explanation': 'No SQL found in text'}
+            
             # Pattern 1: SQL in code blocks
-            sql_patterns = [
-                r'```sql\s*(.*?)\s*```',
-                r'```\s*(SELECT.*?(?:;|\Z))\s*```',
-                r'SQL[:\s]*`(.*?)`',
-                r'Query[:\s]*`(.*?)`',
-            ]
-            
-            for pattern in sql_patterns:
-                matches = re.findall(pattern, text, re.DOTALL | re.IGNORECASE)
+            for pattern in _TEXT_SQL_BLOCK_PATTERNS:
+                matches = pattern.findall(text)
                 for match in matches:
                     sql = match.strip()
                     if sql and sql.upper().startswith('SELECT'):
@@ -455,8 +477,7 @@ Response format:
                         }
             
             # Pattern 2: Look for SELECT statements
-            select_pattern = r'(SELECT\b.*?)(?:\n\n|\Z|;)'
-            matches = re.findall(select_pattern, text, re.DOTALL | re.IGNORECASE)
+            matches = _TEXT_SELECT_PATTERN.findall(text)
             for match in matches:
                 sql = match.strip().rstrip(';')
                 if len(sql) > 10:  # Ensure it's substantial
@@ -466,8 +487,7 @@ Response format:
                     }
             
             # Pattern 3: JSON-like but malformed
-            json_like_pattern = r'"sql"\s*:\s*"(.*?)"'
-            matches = re.findall(json_like_pattern, text, re.DOTALL | re.IGNORECASE)
+            matches = _TEXT_JSON_LIKE_PATTERN.findall(text)
             for match in matches:
                 sql = match.strip().replace('\\n', '\n').replace('\\"', '"')
                 if sql and sql.upper().startswith('SELECT'):
@@ -944,17 +964,14 @@ class VertexAISQLGenTool(SQLGenTool):
             cleaned_text = content.strip()
             
             # Remove common markdown artifacts that interfere with parsing
-            cleaned_text = re.sub(r'^```json\s*', '', cleaned_text, flags=re.MULTILINE | re.IGNORECASE)
-            cleaned_text = re.sub(r'^```\s*', '', cleaned_text, flags=re.MULTILINE)
-            cleaned_text = re.sub(r'\s*```$', '', cleaned_text, flags=re.MULTILINE)
-            cleaned_text = re.sub(r'^\s*```json\s*', '', cleaned_text, flags=re.IGNORECASE)
-            cleaned_text = re.sub(r'\s*```\s*$', '', cleaned_text)
+            for fence_pattern in _MARKDOWN_FENCE_PATTERNS:
+                cleaned_text = fence_pattern.sub('', cleaned_text)
             
             logger.info(f"🧹 PARSING - Cleaned Vertex AI text length: {len(cleaned_text)} characters")
             
             # STRATEGY 1: Direct JSON parsing
             try:
-                parsed = json.loads(cleaned_text)
+                parsed = _loads_json(cleaned_text)
                 if isinstance(parsed, dict):
                     if 'sql' in parsed and parsed['sql'].strip():
                         logger.info("✅ PARSING - Successfully parsed Vertex AI response as direct JSON")
@@ -973,20 +990,13 @@ class VertexAISQLGenTool(SQLGenTool):
                 pass
             
             # STRATEGY 2: JSON extraction from markdown code blocks
-            markdown_patterns = [
-                r'```json\s*(\{.*?\})\s*```',          # ```json {...} ```
-                r'```\s*(\{.*?\})\s*```',              # ``` {...} ```
-                r'```json\s*(\{[^`]*?\})\s*```',       # More permissive JSON in markdown
-                r'```\s*(\{[^`]*?\})\s*```',           # More permissive generic markdown
-            ]
-            
-            for i, pattern in enumerate(markdown_patterns):
-                matches = re.findall(pattern, content, re.DOTALL | re.IGNORECASE)
+            for i, pattern in enumerate(_RESPONSE_MARKDOWN_JSON_PATTERNS):
+                matches = pattern.findall(content)
                 for match in matches:
                     json_str = match.strip()
                     if json_str:
                         try:
-                            parsed = json.loads(json_str)
+                            parsed = _loads_json(json_str)
                             if isinstance(parsed, dict) and ('sql' in parsed or 'query' in parsed):
                                 sql_key = 'sql' if 'sql' in parsed else 'query'
                                 if parsed[sql_key].strip():
@@ -1000,21 +1010,12 @@ class VertexAISQLGenTool(SQLGenTool):
                             continue
             
             # STRATEGY 3: Regex-based JSON extraction with SQL key detection
-            json_patterns = [
-                r'(\{[^{}]*"sql"[^{}]*"[^"]*"[^{}]*\})',                    # Simple SQL key detection
-                r'(\{[^{}]*"query"[^{}]*"[^"]*"[^{}]*\})',                  # Simple query key detection  
-                r'(\{[^{}]*"sql"\s*:\s*"[^"]*SELECT[^"]*"[^{}]*\})',        # SQL with SELECT keyword
-                r'(\{[^{}]*"query"\s*:\s*"[^"]*SELECT[^"]*"[^{}]*\})',      # Query with SELECT keyword
-                r'(\{.*?"sql"\s*:\s*".*?".*?\})',                          # Flexible SQL key
-                r'(\{.*?"query"\s*:\s*".*?".*?\})',                        # Flexible query key
-            ]
-            
-            for i, pattern in enumerate(json_patterns):
-                matches = re.findall(pattern, content, re.DOTALL | re.IGNORECASE)
+            for i, pattern in enumerate(_RESPONSE_JSON_KEY_PATTERNS):
+                matches = pattern.findall(content)
                 for match in matches:
                     if match.strip():
                         try:
-                            parsed = json.loads(match)
+                            parsed = _loads_json(match)
                             if isinstance(parsed, dict):
                                 sql_key = 'sql' if 'sql' in parsed else 'query' if 'query' in parsed else None
                                 if sql_key and parsed[sql_key].strip():
@@ -1027,42 +1028,30 @@ class VertexAISQLGenTool(SQLGenTool):
                             continue
             
             # STRATEGY 4: Balanced brace matching for complex JSON
-            brace_stack = []
-            start_indices = []
-            
-            for i, char in enumerate(content):
-                if char == '{':
-                    if not brace_stack:
-                        start_indices.append(i)
-                    brace_stack.append(char)
-                elif char == '}' and brace_stack:
-                    brace_stack.pop()
-                    if not brace_stack and start_indices:
-                        start_idx = start_indices.pop()
-                        json_candidate = content[start_idx:i+1]
-                        try:
-                            parsed = json.loads(json_candidate)
-                            if isinstance(parsed, dict):
-                                sql_key = 'sql' if 'sql' in parsed else 'query' if 'query' in parsed else None
-                                if sql_key and parsed[sql_key].strip():
-                                    logger.info("✅ PARSING - Extracted JSON from Vertex AI using balanced brace matching")
-                                    return {
-                                        'sql': parsed[sql_key].strip(),
-                                        'explanation': parsed.get('explanation', 'SQL query extracted via brace matching')
-                                    }
-                        except json.JSONDecodeError:
-                            continue
+            # raw_decode finds where each object ends in C (and ignores braces inside strings),
+            # replacing the character-by-character brace counter
+            decoder = json.JSONDecoder()
+            start_idx = content.find('{')
+            while start_idx != -1:
+                try:
+                    parsed, end_idx = decoder.raw_decode(content, start_idx)
+                except json.JSONDecodeError:
+                    start_idx = content.find('{', start_idx + 1)
+                    continue
+                
+                if isinstance(parsed, dict):
+                    sql_key = 'sql' if 'sql' in parsed else 'query' if 'query' in parsed else None
+                    if sql_key and isinstance(parsed[sql_key], str) and parsed[sql_key].strip():
+                        logger.info("✅ PARSING - Extracted JSON from Vertex AI using balanced brace matching")
+                        return {
+                            'sql': parsed[sql_key].strip(),
+                            'explanation': parsed.get('explanation', 'SQL query extracted via brace matching')
+                        }
+                start_idx = content.find('{', end_idx)
             
             # STRATEGY 5: SQL extraction from code blocks
-            sql_block_patterns = [
-                r'```sql\s*(.*?)\s*```',                    # SQL code blocks
-                r'```\s*(SELECT.*?)\s*```',                 # Generic SELECT blocks
-                r'```sql\s*(SELECT.*?)```',                 # SQL with SELECT (no end whitespace)
-                r'```\s*(WITH.*?SELECT.*?)\s*```',          # CTE queries
-            ]
-            
-            for i, pattern in enumerate(sql_block_patterns):
-                matches = re.findall(pattern, content, re.DOTALL | re.IGNORECASE)
+            for i, pattern in enumerate(_RESPONSE_SQL_BLOCK_PATTERNS):
+                matches = pattern.findall(content)
                 for match in matches:
                     sql = match.strip()
                     if sql and sql.upper().startswith(('SELECT', 'WITH')):
@@ -1073,14 +1062,8 @@ class VertexAISQLGenTool(SQLGenTool):
                         }
             
             # STRATEGY 6: Raw SQL detection with SELECT statement patterns
-            raw_sql_patterns = [
-                r'(SELECT\s+(?:[^;])+?)(?:\s*[;}]|\s*$)',               # Complete SELECT statements
-                r'(WITH\s+.+?SELECT\s+(?:[^;])+?)(?:\s*[;}]|\s*$)',     # CTE queries
-                r'(SELECT\s+.+?FROM\s+.+?)(?:\n\s*\n|\s*$|;)',          # SELECT...FROM with end detection
-            ]
-            
-            for i, pattern in enumerate(raw_sql_patterns):
-                matches = re.findall(pattern, content, re.DOTALL | re.IGNORECASE)
+            for i, pattern in enumerate(_RESPONSE_RAW_SQL_PATTERNS):
+                matches = pattern.findall(content)
                 for match in matches:
                     sql = match.strip().rstrip(';')
                     # Validate it's a substantial SQL query
@@ -1094,15 +1077,8 @@ class VertexAISQLGenTool(SQLGenTool):
                         }
             
             # STRATEGY 7: Malformed JSON repair and extraction
-            malformed_patterns = [
-                r'"sql"\s*:\s*"([^"]*)"',                   # Extract SQL value from malformed JSON
-                r'"query"\s*:\s*"([^"]*)"',                 # Extract query value from malformed JSON
-                r"'sql'\s*:\s*'([^']*)'",                   # Single quotes variant
-                r"'query'\s*:\s*'([^']*)'",                 # Single quotes query variant
-            ]
-            
-            for i, pattern in enumerate(malformed_patterns):
-                matches = re.findall(pattern, content, re.DOTALL | re.IGNORECASE)
+            for i, pattern in enumerate(_RESPONSE_MALFORMED_JSON_PATTERNS):
+                matches = pattern.findall(content)
                 for match in matches:
                     sql = match.strip().replace('\\n', '\n').replace('\\"', '"').replace("\\'", "'")
                     if sql and sql.upper().startswith(('SELECT', 'WITH')):
@@ -1183,7 +1159,7 @@ class VertexAISQLGenTool(SQLGenTool):
                 return None
                 
             json_str = text[start:end]
-            return json.loads(json_str)
+            return _loads_json(json_str)
             
         except (json.JSONDecodeError, ValueError, IndexError):
             # Multiple fallback strategies
@@ -1196,7 +1172,7 @@ class VertexAISQLGenTool(SQLGenTool):
                 match = re.search(pattern, text, re.DOTALL | re.IGNORECASE)
                 if match:
                     try:
-                        return json.loads(match.group(1))
+                        return _loads_json(match.group(1))
                     except:
                         continue
             return None
@@ -1468,3 +1444,24 @@ def create_sql_gen_tool(
         raise ValueError(f"Unknown tool type: {tool_type}")
 
 
+@functools.lru_cache(maxsize=8)
+def get_sql_gen_tool(
+    tool_type: str = "vertex_ai",
+    **kwargs
+) -> SQLGenTool:
+    """
+    Get a shared SQL generation tool for the given configuration.
+    
+    Tools keep no per-request state, so one instance per (type, parameters) is reused
+    instead of repeating vertexai.init and model construction on every call.
+    
+    Args:
+        tool_type: Type of tool ("vertex_ai" or "rule_based")
+        **kwargs: Additional parameters for tool initialization (must be hashable)
+        
+    Returns:
+        Cached SQL generation tool instance
+    """
+    return create_sql_gen_tool(tool_type, **kwargs)
+
+
@@ -113,17 +113,18 @@ class SummaryTool:
         # Analyze query progression
         if len(questions) > 1:
             progression_patterns = []
+            last_question = questions[-1].lower()
             
             # Check for drill-down pattern
-            if any(word in questions[-1].lower() for word in ['filter', 'where', 'only', 'specific']):
+            if any(word in last_question for word in ['filter', 'where', 'only', 'specific']):
                 progression_patterns.append("drill-down analysis")
             
             # Check for comparison pattern
-            if any(word in questions[-1].lower() for word in ['compare', 'vs', 'versus', 'difference']):
+            if any(word in last_question for word in ['compare', 'vs', 'versus', 'difference']):
                 progression_patterns.append("comparative analysis")
             
             # Check for trend analysis
-            if any(word in questions[-1].lower() for word in ['trend', 'over time', 'historical', 'change']):
+            if any(word in last_question for word in ['trend', 'over time', 'historical', 'change']):
                 progression_patterns.append("trend analysis")
             
             if progression_patterns:
@@ -176,13 +177,18 @@ class SummaryTool:
         for col in df.columns:
             if df[col].dtype in [np.int64, np.float64, int, float]:
                 insights['numeric_columns'].append(col)
-                # Calculate key statistics
-                insights['key_stats'][col] = {
-                    'sum': float(df[col].sum()) if not df[col].isna().all() else 0,
-                    'mean': float(df[col].mean()) if not df[col].isna().all() else 0,
-                    'min': float(df[col].min()) if not df[col].isna().all() else 0,
-                    'max': float(df[col].max()) if not df[col].isna().all() else 0
-                }
+                # Calculate key statistics from one NaN-free array; mean reuses the sum
+                values = df[col].dropna().to_numpy()
+                if values.size:
+                    col_sum = float(values.sum())
+                    insights['key_stats'][col] = {
+                        'sum': col_sum,
+                        'mean': col_sum / values.size,
+                        'min': float(values.min()),
+                        'max': float(values.max())
+                    }
+                else:
+                    insights['key_stats'][col] = {'sum': 0, 'mean': 0, 'min': 0, 'max': 0}
             else:
                 insights['categorical_columns'].append(col)
                 # Analyze categorical patterns
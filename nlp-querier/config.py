@@ -39,6 +39,8 @@ def get_config() -> Dict[str, Any]:
         "database": {
             "type": database_type,
             "connection_string": database_url,
+            "pool_max_connections": int(os.getenv("DB_POOL_MAX_CONNECTIONS", "10")),
+            "pool_timeout_seconds": float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "5")),
         },
         
         # AI Configuration (Vertex AI with Application Default Credentials)
@@ -75,7 +77,11 @@ def get_database_manager():
         return SQLiteManager("output/fcfp_analytics.db")
     elif db_type == "postgresql":
         from utils.db import DatabaseManager
-        return DatabaseManager(config["database"]["connection_string"])
+        return DatabaseManager(
+            config["database"]["connection_string"],
+            pool_max_connections=config["database"]["pool_max_connections"],
+            pool_timeout_seconds=config["database"]["pool_timeout_seconds"]
+        )
     else:
         raise ValueError(f"Unsupported database type: {db_type}")
 
@@ -6,55 +6,143 @@ import streamlit as st
 import sys
 from pathlib import Path
 import json
+import pandas as pd
+import pyarrow as pa
 from typing import Dict, List, Any
 import os
+import atexit
+import itertools
 import logging
+import logging.handlers
+import queue
+import reprlib
+import secrets
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+class BufferedFileHandler(logging.FileHandler):
+    """File handler that writes through a 1 MB block buffer instead of flushing every record."""
+    
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=1 << 20, encoding=self.encoding, errors=self.errors)
+    
+    def flush(self):
+        # The buffer is written out when it fills, on errors, and when the handler is closed at exit
+        pass
+    
+    def emit(self, record):
+        super().emit(record)
+        if record.levelno >= logging.ERROR and self.stream:
+            self.stream.flush()
+    
+    def flush_to_disk(self):
+        """Write out whatever is currently held in the file buffer."""
+        self.acquire()
+        try:
+            if self.stream:
+                self.stream.flush()
+        finally:
+            self.release()
+
+
+# Longest time buffered log records wait before reaching the log file
+LOG_FLUSH_INTERVAL_SECONDS = 5
+
+
 # Configure comprehensive logging for the application
+@st.cache_resource(show_spinner=False)
 def setup_logging():
-    """Set up detailed logging configuration for the Analytics Agent."""
+    """
+    Set up detailed logging configuration for the Analytics Agent.
+    
+    Streamlit re-executes this module on every rerun, so the handlers, listener thread
+    and log file are created once per process and reused afterwards.
+    
+    Returns:
+        Tuple of (log file path, running QueueListener)
+    """
+    # Second guard for when the resource cache is cleared while the listener is still installed
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, logging.handlers.QueueHandler) and hasattr(handler, "log_filename"):
+            return handler.log_filename, handler.log_listener
+    
     # Create logs directory if it doesn't exist
     logs_dir = Path("output/logs")
     logs_dir.mkdir(parents=True, exist_ok=True)
     
     # Create log filename with timestamp
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    log_filename = logs_dir / f"analytics_agent_{timestamp}.log"
+    # Kept as a plain string: it is handed to the file handler, stored on the queue handler and logged
+    log_filename = os.fspath(logs_dir / f"analytics_agent_{timestamp}.log")
+    
+    # Buffer file records in memory so bursts of log lines land in one write;
+    # errors flush immediately and anything left is flushed on interpreter exit
+    formatter = logging.Formatter('%(asctime)s | %(levelname)-8s | %(name)-25s | %(message)s')
+    file_handler = BufferedFileHandler(log_filename, encoding='utf-8')
+    file_handler.setFormatter(formatter)
+    memory_handler = logging.handlers.MemoryHandler(
+        capacity=1024,
+        flushLevel=logging.ERROR,
+        target=file_handler
+    )
+    console_handler = logging.StreamHandler(sys.stdout)  # Also log to console
+    console_handler.setFormatter(formatter)
+    
+    # Callers only enqueue records; formatting and I/O happen on the listener's thread
+    log_queue = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(
+        log_queue,
+        memory_handler,
+        console_handler,
+        respect_handler_level=True
+    )
+    listener.start()
+    
+    # Push buffered records to disk periodically so the file stays current on a quiet server
+    stop_flushing = threading.Event()
+    
+    def _flush_periodically():
+        while not stop_flushing.wait(LOG_FLUSH_INTERVAL_SECONDS):
+            memory_handler.flush()
+            file_handler.flush_to_disk()
+    
+    threading.Thread(target=_flush_periodically, name="log-flusher", daemon=True).start()
+    
+    def _stop_logging():
+        stop_flushing.set()
+        listener.stop()
+        memory_handler.flush()
+    
+    atexit.register(_stop_logging)
+    
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    # Records are formatted by the listener's handlers; only merge args into the message here
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    queue_handler.log_filename = log_filename
+    queue_handler.log_listener = listener
     
     # Configure logging
     logging.basicConfig(
         level=logging.INFO,
-        format='%(asctime)s | %(levelname)-8s | %(name)-25s | %(message)s',
-        handlers=[
-            logging.FileHandler(log_filename, encoding='utf-8'),
-            logging.StreamHandler(sys.stdout)  # Also log to console
-        ]
+        handlers=[queue_handler]
     )
     
-    # Set specific loggers to INFO level
-    for logger_name in [
-        'agent.graph',
-        'agent.nodes.generate_sql',
-        'agent.nodes.validate_sql', 
-        'agent.nodes.execute_sql',
-        'agent.tools.sql_validator_tool',
-        'agent.tools.sql_executor_tool',
-        'agent.tools.schema_tool'
-    ]:
-        logging.getLogger(logger_name).setLevel(logging.INFO)
+    # Set agent loggers to INFO level; agent.graph, agent.nodes.* and agent.tools.* inherit it
+    logging.getLogger('agent').setLevel(logging.INFO)
     
     logger = logging.getLogger(__name__)
     logger.info("="*80)
     logger.info("🚀 ANALYTICS AGENT - STREAMLIT APPLICATION STARTED")
     logger.info("="*80)
-    logger.info(f"📝 Logging to file: {log_filename}")
-    logger.info(f"📊 Log level: {logging.getLevelName(logging.getLogger().level)}")
+    logger.info("📝 Logging to file: %s", log_filename)
+    logger.info("📊 Log level: %s", logging.getLevelName(logging.getLogger().level))
     
-    return log_filename
+    return log_filename, listener
 
 # Setup logging before anything else
-log_file = setup_logging()
+log_file, _log_listener = setup_logging()
 logger = logging.getLogger(__name__)
 
 # Configure page
@@ -76,40 +164,303 @@ except ImportError as e:
     st.error(f"Error importing agent components: {e}")
     st.stop()
 
+# Rows of each query result kept in the chat history
+MAX_STORED_RESULT_ROWS = 50
 
-import streamlit as st
-import json
-import sys
-import os
+# Messages drawn on each rerun; "Show earlier messages" extends the window by this much
+HISTORY_WINDOW = 20
 
-# Add the parent directory to the path so we can import the agent
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Chat messages kept per session; the oldest are dropped beyond this
+MAX_STORED_MESSAGES = 200
+
+# Progress labels shown while the agent runs, keyed by the workflow node that just finished
+_STEP_LABELS = {
+    "intent": "Understood the question",
+    "clarification": "Checked whether clarification is needed",
+    "lookup_schema": "Loaded the database schema",
+    "generate_sql": "Generated SQL",
+    "validate_sql": "Validated SQL",
+    "execute_sql": "Ran the query",
+    "fix_sql_error": "Fixed the SQL after an error",
+    "summarize": "Summarized the results",
+    "interpret_results": "Interpreted the results",
+}
+
+# Bounded repr for debug dumps of stored results
+_DEBUG_REPR = reprlib.Repr()
+_DEBUG_REPR.maxdict = 20
+_DEBUG_REPR.maxlist = 20
+
+# Metadata rendered in its own section, so left out of "Additional Details"
+_RENDERED_METADATA_KEYS = frozenset({'sql', 'execution_result', 'execution_error', 'summary', 'business_interpretation'})
+
+
+def pack_result_for_history(execution_result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert a serialized 'dataframe' result into Arrow IPC bytes for session storage.
+    
+    Reruns redraw every message, and reading an Arrow stream back is much cheaper than
+    rebuilding a DataFrame from a list of row dictionaries.
+    
+    Args:
+        execution_result: Result from the execution node with 'data' as a list of records
+        
+    Returns:
+        Result with type 'arrow' and IPC bytes in 'data'; empty results are returned
+        unchanged, and results that cannot be represented in Arrow keep their first
+        MAX_STORED_RESULT_ROWS records
+    """
+    records = execution_result.get("data") or []
+    if not records:
+        return execution_result
+    
+    columns = execution_result.get("columns")
+    shape = tuple(execution_result.get("shape") or (len(records), len(columns or records[0])))
+    records = records[:MAX_STORED_RESULT_ROWS]
+    try:
+        df = pd.DataFrame(records, columns=columns)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    except (pa.ArrowException, TypeError, ValueError) as e:
+        logger.warning("⚠️ Could not pack result as Arrow, keeping records: %s", e)
+        return {**execution_result, "data": records, "shape": shape, "truncated": shape[0] > len(records)}
+    
+    return {
+        "type": "arrow",
+        "data": sink.getvalue().to_pybytes(),
+        "columns": list(df.columns),
+        "shape": shape,
+        "truncated": shape[0] > len(df)
+    }
+
+
+def result_table(execution_result: Dict[str, Any]):
+    """Return a displayable table for a stored result, reading Arrow IPC bytes without a pandas round trip."""
+    if execution_result.get("type") == "arrow":
+        return pa.ipc.open_stream(execution_result["data"]).read_all()
+    return pd.DataFrame(execution_result["data"][:MAX_STORED_RESULT_ROWS])
+
+
+@st.cache_resource(show_spinner=False)
+def get_agent_executor() -> ThreadPoolExecutor:
+    """Return the process-wide worker pool that runs agent workflows off the script thread."""
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="agent")
+
+
+def run_agent_with_progress(user_input: str, status) -> Dict[str, Any]:
+    """
+    Run the agent in a worker thread and show each finished workflow step in a placeholder.
+    
+    Streamlit calls must stay on the script thread, so the worker only reports
+    node names through a queue and this function renders them while it waits.
+    
+    Args:
+        user_input: User's question
+        status: st.empty() placeholder for the progress line
+        
+    Returns:
+        Result dictionary from run_agent_chat
+    """
+    progress = queue.Queue()
+    future = get_agent_executor().submit(
+        run_agent_chat,
+        user_input,
+        st.session_state.conversation_history,
+        thread_id=st.session_state.thread_id,
+        on_step=progress.put
+    )
+    
+    while not future.done() or not progress.empty():
+        try:
+            node = progress.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        status.caption(f"⏳ {_STEP_LABELS.get(node, node)}…")
+    
+    status.empty()
+    return future.result()
 
-# Import common libraries
-import pandas as pd
-import json
-from pathlib import Path
 
 def initialize_session_state():
     """Initialize Streamlit session state variables."""
     if "messages" not in st.session_state:
-        st.session_state.messages = []
+        st.session_state.messages = deque(maxlen=MAX_STORED_MESSAGES)
     
     if "conversation_history" not in st.session_state:
         st.session_state.conversation_history = []
     
     if "thread_id" not in st.session_state:
-        import uuid
-        st.session_state.thread_id = f"user_{str(uuid.uuid4())[:8]}"
+        st.session_state.thread_id = f"user_{secrets.token_hex(4)}"
     
     if "awaiting_clarification" not in st.session_state:
         st.session_state.awaiting_clarification = False
     
     if "clarification_question" not in st.session_state:
         st.session_state.clarification_question = None
-# caching
-    if "query_cache" not in st.session_state:
-        st.session_state.query_cache = {}
+    
+    if "history_window" not in st.session_state:
+        st.session_state.history_window = HISTORY_WINDOW
+
+
+# st.fragment needs Streamlit 1.37+; older releases render fragments as part of the full run
+_fragment = getattr(st, "fragment", lambda func: func)
+
+
+@_fragment
+def render_sidebar():
+    """Render the sidebar controls; as a fragment its own widgets rerun only this function."""
+    st.header("Controls")
+    
+    # Clear chat button with unique key
+    if st.button("🗑️ Clear Chat", key="sidebar_clear_chat"):
+        st.session_state.messages = deque(maxlen=MAX_STORED_MESSAGES)
+        st.session_state.conversation_history = []
+        st.session_state.awaiting_clarification = False
+        st.session_state.history_window = HISTORY_WINDOW
+        # Reset thread_id to start fresh memory
+        st.session_state.thread_id = f"user_{secrets.token_hex(4)}"
+        st.rerun()
+    
+    # Stats
+    st.subheader("Stats")
+    st.metric("Messages", len(st.session_state.messages))
+    
+    # Memory persistence info
+    st.subheader("🧠 Memory")
+    st.info(f"**Session ID:** `{st.session_state.thread_id}`")
+    st.caption("Each conversation has persistent memory across messages")
+
+
+def render_message(message: Dict[str, Any]):
+    """Render one chat message with its SQL, results, insights and details."""
+    with st.chat_message(message["role"]):
+        st.write(message["content"])
+        
+        # Show metadata if available (SQL, results, etc.)
+        if "metadata" in message and message["metadata"]:
+            metadata = message["metadata"]
+            
+            # Show SQL
+            if metadata.get("sql"):
+                with st.expander("Generated SQL"):
+                    st.code(metadata["sql"], language="sql")
+            
+            # Check for operation_not_permitted flag
+            if metadata.get("operation_not_permitted"):
+                st.warning("⚠️ Operation not permitted: The requested delete operation was blocked.")
+
+            # Show execution results
+            execution_result = metadata.get("execution_result")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("execution_result = %s", _DEBUG_REPR.repr(execution_result))
+
+            if execution_result is not None:
+                # Handle both formats: 'dataframe' from execution node and 'DataFrame' from UI processing
+                if isinstance(execution_result, dict) and execution_result.get("type") in ["DataFrame", "dataframe", "arrow"]:
+                    # Handle serialized DataFrame
+                    data = execution_result.get("data", []) or []  # Records list, or Arrow IPC bytes for stored results
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("data = %s", _DEBUG_REPR.repr(data))
+
+                    if data:
+                        # Build the table once per message and reuse it on later reruns
+                        df = message.get("result_table")
+                        if df is None:
+                            df = message["result_table"] = result_table(execution_result)
+                        # Use shape if available, otherwise count data
+                        shape = execution_result.get("shape") or (len(df), len(df.columns) if len(df) > 0 else 0)  # Ensure shape is valid
+                        logger.debug("shape = %s", shape)
+
+                        row_count = shape[0] if isinstance(shape, (tuple, list)) else len(df)
+                        truncated = execution_result.get("truncated", False)
+
+                        title = f"Query Results ({row_count} rows, {shape[1] if isinstance(shape, (tuple, list)) else len(df.columns)} columns)"
+                        if truncated:
+                            title += f" - Showing first {MAX_STORED_RESULT_ROWS}"
+
+                        with st.expander(title, expanded=True):
+                            # Show PII protection status if available
+                            if "pii_findings" in metadata:
+                                pii_findings = metadata["pii_findings"]
+                                if pii_findings:
+                                    # Reserve the summary slot above the details and fill it once the count is known
+                                    pii_summary = st.empty()
+                                    pii_count = 0
+
+                                    with st.expander("PII Detection Details", expanded=False):
+                                        for column, findings in pii_findings.items():
+                                            pii_count += len(findings)
+                                            st.write(f"**Column '{column}':** {len(findings)} instances")
+                                            for finding in findings[:3]:  # Show first 3
+                                                st.write(f"  • {finding.get('description', finding.get('type', 'Unknown'))}")
+                                            if len(findings) > 3:
+                                                st.write(f"  • ... and {len(findings) - 3} more")
+
+                                    pii_summary.warning(f"🔒 **Privacy Protection:** {pii_count} PII instances detected and redacted")
+                                else:
+                                    st.success("🔒 **Privacy Protection:** No PII detected in results")
+
+                            st.dataframe(df, use_container_width=True, hide_index=True)
+
+                            if truncated:
+                                st.info(f"Showing first {MAX_STORED_RESULT_ROWS} rows of {row_count} total rows")
+                    else:
+                        st.info("**Result:** Query executed successfully but returned no data")
+                        st.write("**Possible reasons:**")
+                        st.write("• The filter criteria don't match any data")
+                        st.write("• The date range may be outside available data")
+                        st.write("• Try using different filter values or check table contents")
+                elif execution_result is not None:
+                    st.write("**Result:** ", str(execution_result))
+            
+            # Show errors
+            if metadata.get("execution_error"):
+                st.error(f"Execution Error: {metadata['execution_error']}")
+            
+            # Show SQL explanation in collapsible section
+            # skipping summarization
+            # if metadata.get("summary"):
+            #     with st.expander("Query Explanation"):
+            #         st.markdown(metadata["summary"])
+            # else:
+            #     st.warning("⚠️ No query explanation available in metadata")
+            
+            # Show business interpretation in collapsible section
+            if metadata.get("business_interpretation"):
+                content = metadata["business_interpretation"]
+                with st.expander("Business Insights"):
+                    # Check if it looks like JSON
+                    stripped = content.strip()
+                    if stripped.startswith('{') and stripped.endswith('}'):
+                        st.error("⚠️ Raw JSON detected instead of formatted content. This should be formatted markdown.")
+                        st.code(content, language='json')
+                    else:
+                        st.markdown(content)
+                    st.caption("LLM-powered business analysis of query results")
+            
+            # Show other metadata in collapsed section; filtered once per message like the result table
+            other_metadata = message.get("other_metadata")
+            if other_metadata is None:
+                other_metadata = message["other_metadata"] = {k: v for k, v in metadata.items() if v and k not in _RENDERED_METADATA_KEYS}
+            if other_metadata:
+                with st.expander("Additional Details"):
+                    st.json(other_metadata)
+
+
+@_fragment
+def render_transcript():
+    """Render the most recent chat messages; as a fragment, revealing earlier ones reruns only the transcript."""
+    messages = st.session_state.messages
+    hidden_count = len(messages) - st.session_state.history_window
+    if hidden_count > 0 and st.button(f"Show earlier messages ({hidden_count} hidden)", key="show_earlier_messages"):
+        st.session_state.history_window += HISTORY_WINDOW
+    
+    # Deques cannot be sliced; islice reads the visible tail without copying the history
+    start = max(len(messages) - st.session_state.history_window, 0)
+    for message in itertools.islice(messages, start, None):
+        render_message(message)
 
 
 def main():
@@ -123,140 +474,23 @@ def main():
     
     # Sidebar
     with st.sidebar:
-        st.header("Controls")
-        
-        # Clear chat button with unique key
-        if st.button("🗑️ Clear Chat", key="sidebar_clear_chat"):
-            st.session_state.messages = []
-            st.session_state.conversation_history = []
-            st.session_state.awaiting_clarification = False
-            # Reset thread_id to start fresh memory
-            import uuid
-            st.session_state.thread_id = f"user_{str(uuid.uuid4())[:8]}"
-            st.rerun()
+        render_sidebar()
         
-        # Stats
-        st.subheader("Stats")
-        st.metric("Messages", len(st.session_state.messages))
-        
-        # Memory persistence info
-        st.subheader("🧠 Memory")
-        st.info(f"**Session ID:** `{st.session_state.thread_id}`")
-        st.caption("Each conversation has persistent memory across messages")
-        
-    # Display existing messages
-    for i, message in enumerate(st.session_state.messages):
-        with st.chat_message(message["role"]):
-            st.write(message["content"])
-            
-            # Show metadata if available (SQL, results, etc.)
-            if "metadata" in message and message["metadata"]:
-                metadata = message["metadata"]
-                
-                # Show SQL
-                if metadata.get("sql"):
-                    with st.expander("Generated SQL"):
-                        st.code(metadata["sql"], language="sql")
-                
-                # Check for operation_not_permitted flag
-                if metadata.get("operation_not_permitted"):
-                    st.warning("⚠️ Operation not permitted: The requested delete operation was blocked.")
-
-                # Show execution results
-                execution_result = metadata.get("execution_result")
-                logger.info(f"DEBUG: execution_result = {execution_result}")  # Debugging log
-
-                if execution_result is not None:
-                    # Handle both formats: 'dataframe' from execution node and 'DataFrame' from UI processing
-                    if isinstance(execution_result, dict) and execution_result.get("type") in ["DataFrame", "dataframe"]:
-                        # Handle serialized DataFrame
-                        data = execution_result.get("data", []) or []  # Ensure data is a list
-                        logger.info(f"DEBUG: data = {data}")  # Debugging log
-
-                        if data:
-                            df = pd.DataFrame(data)
-                            # Use shape if available, otherwise count data
-                            shape = execution_result.get("shape") or (len(df), len(df.columns) if len(df) > 0 else 0)  # Ensure shape is valid
-                            logger.info(f"DEBUG: shape = {shape}")  # Debugging log
-
-                            row_count = shape[0] if isinstance(shape, (tuple, list)) else len(df)
-                            truncated = execution_result.get("truncated", False)
-
-                            title = f"Query Results ({row_count} rows, {shape[1] if isinstance(shape, (tuple, list)) else len(df.columns)} columns)"
-                            if truncated:
-                                title += " - Showing first 50"
-
-                            with st.expander(title, expanded=True):
-                                # Show PII protection status if available
-                                if "pii_findings" in metadata:
-                                    pii_findings = metadata["pii_findings"]
-                                    if pii_findings:
-                                        pii_count = sum(len(findings) for findings in pii_findings.values())
-                                        st.warning(f"🔒 **Privacy Protection:** {pii_count} PII instances detected and redacted")
-
-                                        with st.expander("PII Detection Details", expanded=False):
-                                            for column, findings in pii_findings.items():
-                                                st.write(f"**Column '{column}':** {len(findings)} instances")
-                                                for finding in findings[:3]:  # Show first 3
-                                                    st.write(f"  • {finding.get('description', finding.get('type', 'Unknown'))}")
-                                                if len(findings) > 3:
-                                                    st.write(f"  • ... and {len(findings) - 3} more")
-                                    else:
-                                        st.success("🔒 **Privacy Protection:** No PII detected in results")
-
-                                st.dataframe(df, use_container_width=True)
-
-                                if truncated:
-                                    st.info(f"Showing first 50 rows of {row_count} total rows")
-                        else:
-                            st.info("**Result:** Query executed successfully but returned no data")
-                            st.write("**Possible reasons:**")
-                            st.write("• The filter criteria don't match any data")
-                            st.write("• The date range may be outside available data")
-                            st.write("• Try using different filter values or check table contents")
-                    elif execution_result is not None:
-                        st.write("**Result:** ", str(execution_result))
-                
-                # Show errors
-                if metadata.get("execution_error"):
-                    st.error(f"Execution Error: {metadata['execution_error']}")
-                
-                # Show SQL explanation in collapsible section
-                # skipping summarization
-                # if metadata.get("summary"):
-                #     with st.expander("Query Explanation"):
-                #         st.markdown(metadata["summary"])
-                # else:
-                #     st.warning("⚠️ No query explanation available in metadata")
-                
-                # Show business interpretation in collapsible section
-                if metadata.get("business_interpretation"):
-                    content = metadata["business_interpretation"]
-                    with st.expander("Business Insights"):
-                        # Check if it looks like JSON
-                        if content.strip().startswith('{') and content.strip().endswith('}'):
-                            st.error("⚠️ Raw JSON detected instead of formatted content. This should be formatted markdown.")
-                            st.code(content, language='json')
-                        else:
-                            st.markdown(content)
-                        st.caption("LLM-powered business analysis of query results")
-                
-                # Show other metadata in collapsed section
-                other_metadata = {k: v for k, v in metadata.items() 
-                                if k not in ['sql', 'execution_result', 'execution_error', 'summary', 'business_interpretation'] and v}
-                if other_metadata:
-                    with st.expander("Additional Details"):
-                        st.json(other_metadata)
+    # Display the most recent messages; earlier ones are revealed on request
+    render_transcript()
     
     # Chat input
     prompt_text = "Provide clarification:" if st.session_state.awaiting_clarification else "Ask a question about your data:"
     
     if user_input := st.chat_input(prompt_text):
-        # Log user interaction
-        logger.info("💬 USER INTERACTION")
-        logger.info(f"  - User Input: {user_input}")
-        logger.info(f"  - Awaiting Clarification: {st.session_state.awaiting_clarification}")
-        logger.info(f"  - Message Count: {len(st.session_state.messages)}")
+        # Collect details of this turn and log them as a single record once it is handled
+        turn_log = {
+            "user_input": user_input,
+            "awaiting_clarification": st.session_state.awaiting_clarification,
+            "message_count": len(st.session_state.messages),
+            "history_length": len(st.session_state.conversation_history),
+            "query_cache": "miss"
+        }
         
         # Add user message to chat
         st.session_state.messages.append({
@@ -271,26 +505,14 @@ def main():
         # Process with agent
         with st.chat_message("assistant"):
             with st.spinner("Processing..."):
-                logger.info("🔄 Starting agent processing...")
                 try:
-                    # --- CACHING LOGIC ---
-                    if not st.session_state.awaiting_clarification and user_input in st.session_state.query_cache:
-                        logger.info("✅ Cache hit! Returning cached result.")
+                    # Repeated questions are answered from the agent's process-wide query cache,
+                    # which is shared across sessions and keyed on the question and its history
+                    result = run_agent_with_progress(user_input, st.empty())
+                    from_cache = bool(result and result.get("from_cache"))
+                    turn_log["query_cache"] = "hit" if from_cache else "miss"
+                    if from_cache:
                         st.info("⚡️ Returning a cached response for this question.")
-                        result = st.session_state.query_cache[user_input]
-                    else:
-                        logger.info("❌ Cache miss. Running full agent workflow.")
-                        result = run_agent_chat(
-                            user_input, 
-                            st.session_state.conversation_history,
-                            thread_id=st.session_state.thread_id
-                        )
-                        if result and not result.get("error") and not result.get("operation_not_permitted") and not result.get("clarification_needed"):
-                            logger.info("✅ Caching successful result for future use.")
-                            st.session_state.query_cache[user_input] = result
-                    # --- END OF CACHING LOGIC ---
-
-                    logger.info("📊 Agent processing completed")
                     
                     if result:
                         if result.get("operation_not_permitted"):
@@ -313,7 +535,7 @@ def main():
                             execution_result = result.get("execution_result")
                             serializable_result = None
                             if isinstance(execution_result, dict) and execution_result.get('type') == 'dataframe':
-                                serializable_result = execution_result
+                                serializable_result = pack_result_for_history(execution_result)
                             
                             message_data = {
                                 "role": "assistant",
@@ -337,10 +559,10 @@ def main():
                                     st.markdown(result["business_interpretation"])
                             
                             if serializable_result and serializable_result.get("data"):
-                                df = pd.DataFrame(serializable_result["data"])
+                                df = message_data["result_table"] = result_table(serializable_result)
                                 shape = serializable_result.get("shape", (len(df), len(df.columns)))
                                 with st.expander(f"Query Results ({shape[0]} rows, {shape[1]} columns)", expanded=True):
-                                    st.dataframe(df, use_container_width=True)
+                                    st.dataframe(df, use_container_width=True, hide_index=True)
                             elif result.get("execution_result") is not None:
                                 st.info("Query executed successfully but returned no data.")
 
@@ -357,13 +579,11 @@ def main():
                 
                 except Exception as e:
                     error_msg = f"An unexpected application error occurred: {str(e)}"
-                    logger.error(f"❌ STREAMLIT APPLICATION ERROR: {e}", exc_info=True)
+                    logger.error("❌ STREAMLIT APPLICATION ERROR: %s", e, exc_info=True)
                     st.error(error_msg)
                     st.session_state.messages.append({"role": "assistant", "content": error_msg, "metadata": {"type": "error", "exception": str(e)}})
         
         # Update conversation history with detailed context
-        logger.info(f"📝 Updating conversation history (current length: {len(st.session_state.conversation_history)})")
-        
         # Add user message
         st.session_state.conversation_history.append({
             "role": "user",
@@ -380,11 +600,12 @@ def main():
                 metadata = last_message.get("metadata", {})
                 
                 # Build enriched assistant message with SQL context
-                enriched_content = assistant_content
+                parts = [assistant_content]
                 if metadata.get("sql"):
-                    enriched_content += f"\n\nGenerated SQL: {metadata['sql']}"
+                    parts.append(f"Generated SQL: {metadata['sql']}")
                 if metadata.get("result_summary"):
-                    enriched_content += f"\n\nResult: {metadata['result_summary']}"
+                    parts.append(f"Result: {metadata['result_summary']}")
+                enriched_content = "\n\n".join(parts)
                 
                 st.session_state.conversation_history.append({
                     "role": "assistant", 
@@ -393,7 +614,21 @@ def main():
                     "result_summary": metadata.get("result_summary")
                 })
         
-        logger.info(f"💬 Conversation updated (new length: {len(st.session_state.conversation_history)})")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "💬 USER INTERACTION\n"
+                "  - User Input: %s\n"
+                "  - Awaiting Clarification: %s\n"
+                "  - Message Count: %d\n"
+                "  - Query Cache: %s\n"
+                "  - Conversation History: %d -> %d messages",
+                turn_log["user_input"],
+                turn_log["awaiting_clarification"],
+                turn_log["message_count"],
+                turn_log["query_cache"],
+                turn_log["history_length"],
+                len(st.session_state.conversation_history)
+            )
 
 
 if __name__ == "__main__":
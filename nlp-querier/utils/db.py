@@ -5,11 +5,17 @@ Provides simplified database connection management for PostgreSQL.
 """
 import os
 import logging
-from typing import Optional, Dict, Any
+import threading
+from typing import Optional, Dict, Any, Tuple
 from contextlib import contextmanager
 
 logger = logging.getLogger(__name__)
 
+POOL_MIN_CONNECTIONS = 1
+# Defaults for DatabaseManager; config.py overrides them from DB_POOL_MAX_CONNECTIONS / DB_POOL_TIMEOUT_SECONDS
+POOL_MAX_CONNECTIONS = 10
+POOL_TIMEOUT_SECONDS = 5.0
+
 
 class DatabaseManager:
     """
@@ -19,15 +25,53 @@ class DatabaseManager:
     safe database operations.
     """
     
-    def __init__(self, connection_string: str):
+    # Pools are shared by every manager for the same connection string, so
+    # managers rebuilt on each Streamlit rerun still reuse open connections.
+    # Each pool is paired with a semaphore counting its free connections.
+    _pools: Dict[str, Tuple[Any, threading.BoundedSemaphore]] = {}
+    _pools_lock = threading.Lock()
+    
+    def __init__(
+        self,
+        connection_string: str,
+        pool_max_connections: int = POOL_MAX_CONNECTIONS,
+        pool_timeout_seconds: float = POOL_TIMEOUT_SECONDS
+    ):
         """
         Initialize database manager.
         
         Args:
             connection_string: PostgreSQL connection string
+            pool_max_connections: Size of the shared pool, fixed by the first manager
+                created for this connection string
+            pool_timeout_seconds: How long to wait for a pooled connection before
+                opening a direct one
         """
         self.connection_string = connection_string
-        self._connection = None
+        self.pool_max_connections = pool_max_connections
+        self.pool_timeout_seconds = pool_timeout_seconds
+    
+    def _get_pool(self) -> Tuple[Any, threading.BoundedSemaphore]:
+        """
+        Return the connection pool for this connection string, creating it on first use.
+        
+        Returns:
+            Tuple of the psycopg2 ThreadedConnectionPool and the semaphore guarding it
+        """
+        entry = self._pools.get(self.connection_string)
+        if entry is None:
+            from psycopg2.pool import ThreadedConnectionPool
+            
+            with self._pools_lock:
+                entry = self._pools.get(self.connection_string)
+                if entry is None:
+                    pool = ThreadedConnectionPool(
+                        POOL_MIN_CONNECTIONS, self.pool_max_connections, self.connection_string
+                    )
+                    entry = (pool, threading.BoundedSemaphore(self.pool_max_connections))
+                    self._pools[self.connection_string] = entry
+                    logger.info("Created PostgreSQL connection pool (max %d connections)", self.pool_max_connections)
+        return entry
     
     def test_connection(self) -> bool:
         """
@@ -37,13 +81,10 @@ class DatabaseManager:
             True if connection successful, False otherwise
         """
         try:
-            import psycopg2
-            
-            conn = psycopg2.connect(self.connection_string)
-            cursor = conn.cursor()
-            cursor.execute("SELECT 1")
-            cursor.close()
-            conn.close()
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT 1")
+                cursor.close()
             
             logger.info("Database connection test successful")
             return True
@@ -57,45 +98,89 @@ class DatabaseManager:
         """
         Context manager for database connections.
         
+        Connections are borrowed from a shared pool and returned on exit; the pool
+        rolls back any open transaction before handing the connection out again.
+        Connections that were closed or could not be rolled back are discarded.
+        
+        psycopg2 pools fail immediately when every connection is checked out, so
+        callers wait on the pool's semaphore instead. After pool_timeout_seconds a
+        direct connection is opened for this call and closed on exit.
+        
         Yields:
             Database connection object
         """
         conn = None
+        pool = None
+        slots = None
+        broken = False
         try:
-            import psycopg2
-            
-            conn = psycopg2.connect(self.connection_string)
+            pool, pool_slots = self._get_pool()
+            if pool_slots.acquire(timeout=self.pool_timeout_seconds):
+                slots = pool_slots
+                conn = pool.getconn()
+            else:
+                logger.warning(
+                    "PostgreSQL pool exhausted for %.1fs; opening a direct connection",
+                    self.pool_timeout_seconds
+                )
+                import psycopg2
+                
+                pool = None
+                conn = psycopg2.connect(self.connection_string)
             yield conn
             
         except Exception as e:
             logger.error(f"Database connection error: {e}")
-            if conn:
-                conn.rollback()
+            if conn and not conn.closed:
+                try:
+                    conn.rollback()
+                except Exception:
+                    broken = True
             raise
         finally:
             if conn:
-                conn.close()
+                if pool is not None:
+                    pool.putconn(conn, close=broken or bool(conn.closed))
+                else:
+                    conn.close()
+            if slots is not None:
+                slots.release()
     
-    def execute_query(self, query: str) -> Dict[str, Any]:
+    def execute_query(self, query: str, limit: Optional[int] = None) -> Dict[str, Any]:
         """
         Execute a SQL query and return results.
         
+        With a limit, plain SELECT queries run on a server-side cursor and only
+        limit + 1 rows are fetched, so a large result never has to fit in memory;
+        the extra row tells whether the result was cut off.
+        
         Args:
             query: SQL query string
+            limit: Maximum number of rows to return; None (the default) fetches every row
             
         Returns:
             Dictionary with results and metadata
         """
         try:
             with self.get_connection() as conn:
-                cursor = conn.cursor()
+                # Named cursors are declared server-side and rows are pulled on fetch.
+                # DECLARE rejects data-modifying statements, including WITH ... INSERT/UPDATE,
+                # so anything but a plain SELECT uses a client-side cursor
+                if limit is not None and query.strip().upper().startswith('SELECT'):
+                    cursor = conn.cursor(name="execute_query_stream")
+                else:
+                    cursor = conn.cursor()
                 cursor.execute(query)
                 
-                # Get column names
-                columns = [desc[0] for desc in cursor.description] if cursor.description else []
-                
                 # Fetch results
-                rows = cursor.fetchall()
+                rows = cursor.fetchall() if limit is None else cursor.fetchmany(limit + 1)
+                
+                truncated = limit is not None and len(rows) > limit
+                if truncated:
+                    rows = rows[:limit]
+                
+                # Get column names (server-side cursors only describe results after a fetch)
+                columns = [desc[0] for desc in cursor.description] if cursor.description else []
                 
                 cursor.close()
                 
@@ -103,7 +188,8 @@ class DatabaseManager:
                     "success": True,
                     "columns": columns,
                     "rows": rows,
-                    "row_count": len(rows)
+                    "row_count": len(rows),
+                    "truncated": truncated
                 }
                 
         except Exception as e:
@@ -113,7 +199,8 @@ class DatabaseManager:
                 "error": str(e),
                 "columns": [],
                 "rows": [],
-                "row_count": 0
+                "row_count": 0,
+                "truncated": False
             }
 
 
@@ -143,12 +230,13 @@ class Database:
             self.connection.close()
 
 
-def create_database_manager(connection_string: Optional[str] = None) -> DatabaseManager:
+def create_database_manager(connection_string: Optional[str] = None, **pool_options) -> DatabaseManager:
     """
     Create database manager from configuration.
     
     Args:
         connection_string: Optional connection string, defaults to DATABASE_URL env var
+        **pool_options: pool_max_connections / pool_timeout_seconds for DatabaseManager
         
     Returns:
         Configured DatabaseManager instance
@@ -162,7 +250,7 @@ def create_database_manager(connection_string: Optional[str] = None) -> Database
     if not connection_string:
         raise ValueError("Database connection string is required")
     
-    return DatabaseManager(connection_string)
+    return DatabaseManager(connection_string, **pool_options)
 
 
 # Example usage:
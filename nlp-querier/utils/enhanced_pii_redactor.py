@@ -239,6 +239,12 @@ class EnhancedPIIRedactor:
                     bi_replacement="PRESERVE_STRUCTURE"
                 )
             ])
+        
+        # Combined pattern used as a cheap gate: text it does not match cannot match any single pattern
+        self._union_pattern = re.compile('|'.join(
+            f"(?i:{p.pattern.pattern})" if p.pattern.flags & re.IGNORECASE else f"(?:{p.pattern.pattern})"
+            for p in self.patterns
+        ))
     
     def redact_text(self, text: str) -> Tuple[str, List[Dict[str, Any]]]:
         """
@@ -253,6 +259,9 @@ class EnhancedPIIRedactor:
         findings = []
         redacted_text = text
         
+        if self._union_pattern.search(text) is None:
+            return redacted_text, findings
+        
         for pattern in self.patterns:
             matches = list(pattern.pattern.finditer(redacted_text))
             
@@ -293,6 +302,54 @@ class EnhancedPIIRedactor:
         
         return redacted_text, findings
 
+    def redact_dataframe(self, df, inplace: bool = False) -> Tuple[Any, Dict[str, List[Dict[str, Any]]]]:
+        """
+        Redact PII from all string (object) columns of a DataFrame.
+        
+        Non-empty cells are stringified, as query results are serialized as text. The
+        combined pattern is matched column-wise first, so only flagged cells go through
+        redact_text.
+        
+        Args:
+            df: pandas DataFrame to redact
+            inplace: Modify df directly instead of a copy
+            
+        Returns:
+            Tuple of (redacted_dataframe, findings_by_column)
+        """
+        redacted_df = df if inplace else df.copy()
+        findings_by_column: Dict[str, List[Dict[str, Any]]] = {}
+        
+        for column in redacted_df.columns:
+            if redacted_df[column].dtype != 'object':
+                continue
+            
+            values = redacted_df[column]
+            as_text = values.map(str)
+            present = (as_text != 'None') & (as_text != '')
+            candidates = present & as_text.str.contains(self._union_pattern)
+            
+            # None and empty cells keep their original value, everything else becomes text
+            new_values = values.where(~present, as_text)
+            column_findings = []
+            # Result columns repeat values heavily; redaction is deterministic per value,
+            # so each distinct value is redacted once and reused for its other occurrences
+            redacted_by_value: Dict[str, Tuple[str, List[Dict[str, Any]]]] = {}
+            for position, is_candidate in enumerate(candidates.tolist()):
+                if is_candidate:
+                    value = new_values.iat[position]
+                    if value not in redacted_by_value:
+                        redacted_by_value[value] = self.redact_text(value)
+                    redacted_value, findings = redacted_by_value[value]
+                    new_values.iat[position] = redacted_value
+                    column_findings.extend(findings)
+            
+            redacted_df[column] = new_values
+            if column_findings:
+                findings_by_column[column] = column_findings
+        
+        return redacted_df, findings_by_column
+
     def get_stats(self) -> Dict[str, int]:
         """Get statistics about cached pseudonyms."""
         return {
@@ -8,13 +8,27 @@ to protect sensitive information in query results and business interpretations.
 """
 
 import re
+import sys
+import functools
 import pandas as pd
 import logging
-from typing import Dict, List, Any, Union, Tuple
+from typing import Dict, List, Any, Union, Tuple, Optional
 from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
 
+_DIGIT_RE = re.compile(r'\d')
+
+# Redaction tokens are interned once so every substitution shares the same string object
+EMAIL_TOKEN = sys.intern('[EMAIL_REDACTED]')
+PHONE_TOKEN = sys.intern('[PHONE_REDACTED]')
+CARD_TOKEN = sys.intern('[CARD_REDACTED]')
+SSN_TOKEN = sys.intern('[SSN_REDACTED]')
+ACCOUNT_TOKEN = sys.intern('[ACCOUNT_REDACTED]')
+CUSTOMER_ID_TOKEN = sys.intern('[CUSTOMER_ID_REDACTED]')
+IP_TOKEN = sys.intern('[IP_REDACTED]')
+NAME_TOKEN = sys.intern('[NAME_REDACTED]')
+
 @dataclass
 class PIIPattern:
     """Represents a PII pattern with detection regex and replacement."""
@@ -22,6 +36,8 @@ class PIIPattern:
     pattern: re.Pattern
     replacement: str
     description: str
+    non_ascii_only: bool = False  # Pattern can only match text containing non-ASCII characters
+    requires: Optional[str] = None  # Cheap prefilter: "@" or "digit" must be present for a match
 
 class PIIRedactor:
     """
@@ -49,92 +65,106 @@ class PIIRedactor:
             PIIPattern(
                 name="email",
                 pattern=re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'),
-                replacement="[EMAIL_REDACTED]",
-                description="Email addresses"
+                replacement=EMAIL_TOKEN,
+                description="Email addresses",
+                requires="@"
             ),
             PIIPattern(
                 name="phone_international",
                 pattern=re.compile(r'\+\d{1,4}\s?\(?\d+\)?[\s\-\.]?\d+[\s\-\.]?\d+(?:x\d+)?\b'),
-                replacement="[PHONE_REDACTED]",
-                description="International phone numbers with country codes"
+                replacement=PHONE_TOKEN,
+                description="International phone numbers with country codes",
+                requires="digit"
             ),
             PIIPattern(
                 name="phone_german",
                 pattern=re.compile(r'\+49\(0\)[\s\d]+|\b0[1-9][\d\s]{7,}\b'),
-                replacement="[PHONE_REDACTED]",
-                description="German phone number formats"
+                replacement=PHONE_TOKEN,
+                description="German phone number formats",
+                requires="digit"
             ),
             PIIPattern(
                 name="phone_us_extensions",
                 pattern=re.compile(r'\b\d{3}[\-\.]\d{3}[\-\.]\d{4}x\d+\b'),
-                replacement="[PHONE_REDACTED]",
-                description="US phone numbers with extensions"
+                replacement=PHONE_TOKEN,
+                description="US phone numbers with extensions",
+                requires="digit"
             ),
             PIIPattern(
                 name="phone_french",
                 pattern=re.compile(r'\+33\s?\(0\)\d+\s?\d+\s?\d+\s?\d+\s?\d+'),
-                replacement="[PHONE_REDACTED]",
-                description="French phone number formats"
+                replacement=PHONE_TOKEN,
+                description="French phone number formats",
+                requires="digit"
             ),
             PIIPattern(
                 name="phone_german_area_codes",
                 pattern=re.compile(r'\(\d{4,6}\)\s?\d{6,8}|\b0\d{4,5}[\s\-]?\d{5,7}\b'),
-                replacement="[PHONE_REDACTED]",
-                description="German area codes with parentheses and local numbers"
+                replacement=PHONE_TOKEN,
+                description="German area codes with parentheses and local numbers",
+                requires="digit"
             ),
             PIIPattern(
                 name="phone_european",
                 pattern=re.compile(r'\(\d{3,5}\)\s?\d{6,8}\b'),
-                replacement="[PHONE_REDACTED]",
-                description="European phone number formats with parentheses"
+                replacement=PHONE_TOKEN,
+                description="European phone number formats with parentheses",
+                requires="digit"
             ),
             PIIPattern(
                 name="phone_basic",
                 pattern=re.compile(r'\b(?:\+?1[-\.\s]?)?\(?[0-9]{3}\)?[-\.\s]?[0-9]{3}[-\.\s]?[0-9]{4}\b'),
-                replacement="[PHONE_REDACTED]",
-                description="Basic phone numbers (fallback)"
+                replacement=PHONE_TOKEN,
+                description="Basic phone numbers (fallback)",
+                requires="digit"
             ),
             PIIPattern(
                 name="credit_card",
                 pattern=re.compile(r'\b(?:4[0-9]{12}(?:[0-9]{3})?|5[1-5][0-9]{14}|3[47][0-9]{13}|3[0-9]{13}|6(?:011|5[0-9]{2})[0-9]{12})\b'),
-                replacement="[CARD_REDACTED]",
-                description="Credit card numbers"
+                replacement=CARD_TOKEN,
+                description="Credit card numbers",
+                requires="digit"
             ),
             PIIPattern(
                 name="ssn",
                 pattern=re.compile(r'\b\d{3}-\d{2}-\d{4}\b'),
-                replacement="[SSN_REDACTED]",
-                description="Social Security Numbers"
+                replacement=SSN_TOKEN,
+                description="Social Security Numbers",
+                requires="digit"
             ),
             PIIPattern(
                 name="account_number",
                 pattern=re.compile(r'\b(?:ACC|ACCT|ACCOUNT)[\s\-_]?[0-9]{3,12}\b', re.IGNORECASE),
-                replacement="[ACCOUNT_REDACTED]",
-                description="Account numbers"
+                replacement=ACCOUNT_TOKEN,
+                description="Account numbers",
+                requires="digit"
             ),
             PIIPattern(
                 name="standalone_account_id",
                 pattern=re.compile(r'\bACC[\-_][0-9]{3,6}\b', re.IGNORECASE), 
-                replacement="[ACCOUNT_REDACTED]",
-                description="Standalone account IDs"
+                replacement=ACCOUNT_TOKEN,
+                description="Standalone account IDs",
+                requires="digit"
             ),
             PIIPattern(
                 name="customer_id",
                 pattern=re.compile(r'\b(?:CUST|CID|CUSTOMER)[\s\-_]?[0-9A-Z]{3,12}\b', re.IGNORECASE),
-                replacement="[CUSTOMER_ID_REDACTED]",
+                replacement=CUSTOMER_ID_TOKEN,
                 description="Customer IDs"
             ),
             PIIPattern(
                 name="standalone_customer_id", 
                 pattern=re.compile(r'\bCUST[\-_][0-9]{3,6}\b', re.IGNORECASE),
-                replacement="[CUSTOMER_ID_REDACTED]",
-                description="Standalone customer IDs"
+                replacement=CUSTOMER_ID_TOKEN,
+                description="Standalone customer IDs",
+                requires="digit"
             ),
             PIIPattern(
                 name="ip_address",
                 pattern=re.compile(r'\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b'),
-                replacement="[IP_REDACTED]",
-                description="IP addresses"
+                replacement=IP_TOKEN,
+                description="IP addresses",
+                requires="digit"
             )
         ]
         
@@ -148,34 +178,42 @@ class PIIRedactor:
                                       r'(?:van\s+de|van\s+der|van\s+den|van\s+|de\s+la|de\s+|du\s+|von\s+der|von\s+|d\'|della\s+|del\s+|di\s+|da\s+)\s*'
                                       r'[A-ZÀ-ÿ\u0100-\u017F\u0180-\u024F\u1E00-\u1EFF][a-zà-ÿ\u0100-\u017F\u0180-\u024F\u1E00-\u1EFF]+'
                                       r'(?:\s+[A-ZÀ-ÿ\u0100-\u017F\u0180-\u024F\u1E00-\u1EFF][a-zà-ÿ\u0100-\u017F\u0180-\u024F\u1E00-\u1EFF]+)*\b', re.UNICODE | re.IGNORECASE),
-                    replacement="[NAME_REDACTED]",
+                    replacement=NAME_TOKEN,
                     description="Dutch/European names with particles (van de, van der, de la, du, von, etc.)"
                 ),
                 PIIPattern(
                     name="hyphenated_names",
                     pattern=re.compile(r'\b[A-ZÀ-ÿ\u0100-\u017F\u0180-\u024F\u1E00-\u1EFF][a-zà-ÿ\u0100-\u017F\u0180-\u024F\u1E00-\u1EFF]+-[A-ZÀ-ÿ\u0100-\u017F\u0180-\u024F\u1E00-\u1EFF][a-zà-ÿ\u0100-\u017F\u0180-\u024F\u1E00-\u1EFF]+\s+[A-ZÀ-ÿ\u0100-\u017F\u0180-\u024F\u1E00-\u1EFF][a-zà-ÿ\u0100-\u017F\u0180-\u024F\u1E00-\u1EFF]+\b', re.UNICODE),
-                    replacement="[NAME_REDACTED]",
+                    replacement=NAME_TOKEN,
                     description="Hyphenated first names with last names (e.g., Jean-Pierre Dubois)"
                 ),
                 PIIPattern(
                     name="full_name_extended", 
                     pattern=re.compile(r'\b[A-ZÀ-ÿ\u0100-\u017F\u0180-\u024F\u1E00-\u1EFF][a-zà-ÿ\u0100-\u017F\u0180-\u024F\u1E00-\u1EFF]+\s+[A-ZÀ-ÿ\u0100-\u017F\u0180-\u024F\u1E00-\u1EFF][a-zà-ÿ\u0100-\u017F\u0180-\u024F\u1E00-\u1EFF]+(?:\s+[A-ZÀ-ÿ\u0100-\u017F\u0180-\u024F\u1E00-\u1EFF][a-zà-ÿ\u0100-\u017F\u0180-\u024F\u1E00-\u1EFF]+)?\b', re.UNICODE),
-                    replacement="[NAME_REDACTED]",
+                    replacement=NAME_TOKEN,
                     description="Full names with international characters (Latin Extended, diacritics)"
                 ),
                 PIIPattern(
                     name="cyrillic_names",
                     pattern=re.compile(r'\b[\u0410-\u042F][\u0430-\u044F]+\s+[\u0410-\u042F][\u0430-\u044F]+(?:\s+[\u0410-\u042F][\u0430-\u044F]+)?\b', re.UNICODE),
-                    replacement="[NAME_REDACTED]",
-                    description="Cyrillic names (Russian, Bulgarian, etc.)"
+                    replacement=NAME_TOKEN,
+                    description="Cyrillic names (Russian, Bulgarian, etc.)",
+                    non_ascii_only=True
                 ),
                 PIIPattern(
                     name="basic_names",
                     pattern=re.compile(r'\b[A-Z][a-z]+\s+[A-Z][a-z]+(?:\s+[A-Z][a-z]+)?\b'),
-                    replacement="[NAME_REDACTED]",
+                    replacement=NAME_TOKEN,
                     description="Basic English names (fallback)"
                 )
             ])
+        
+        # One automaton over every pattern: a miss here proves none of them can match,
+        # so clean text costs a single scan instead of one per pattern
+        self._union_pattern = re.compile('|'.join(
+            f"(?i:{p.pattern.pattern})" if p.pattern.flags & re.IGNORECASE else f"(?:{p.pattern.pattern})"
+            for p in self.patterns
+        ))
     
     def detect_pii(self, text: str) -> List[Dict[str, Any]]:
         """
@@ -188,8 +226,18 @@ class PIIRedactor:
             List of PII findings with type, value, and position
         """
         findings = []
+        if self._union_pattern.search(text) is None:
+            return findings
+        
+        is_ascii = text.isascii()
+        has_at = '@' in text
+        has_digit = _DIGIT_RE.search(text) is not None
         
         for pattern in self.patterns:
+            if is_ascii and pattern.non_ascii_only:
+                continue
+            if (pattern.requires == "@" and not has_at) or (pattern.requires == "digit" and not has_digit):
+                continue
             matches = pattern.pattern.finditer(text)
             for match in matches:
                 findings.append({
@@ -286,7 +334,7 @@ class PIIRedactor:
                 # Only keep phone findings that look like actual phone numbers
                 value = finding.get('value', '')
                 # Skip if it's obviously not a phone number (need at least 7 digits)
-                digit_count = len([c for c in value if c.isdigit()])
+                digit_count = sum(map(str.isdigit, value))
                 if digit_count >= 7:
                     filtered_findings.append(finding)
             else:
@@ -326,8 +374,15 @@ class PIIRedactor:
         for column in df.columns:
             if df[column].dtype == 'object':  # String columns
                 column_findings = []
-                
-                for idx, value in df[column].items():
+
+                # Vectorized prefilter: only cells the union pattern hits need the full per-pattern pass
+                try:
+                    candidates = df[column].str.contains(self._union_pattern, na=False)
+                except (AttributeError, TypeError):
+                    # .str refuses columns without string values; fall back to checking every cell
+                    candidates = pd.Series(True, index=df.index)
+
+                for idx, value in df[column][candidates].items():
                     if pd.notna(value) and isinstance(value, str):
                         redacted_value, findings = self.redact_text(str(value))
                         if findings:
@@ -444,15 +499,11 @@ class PIIRedactor:
         report += "🔒 All detected PII has been redacted for security.\n"
         return report
 
-# Global PII redactor instance
-_global_redactor = None
-
+# Shared PII redactor instances, one per configuration
+@functools.lru_cache(maxsize=8)
 def get_pii_redactor(enable_name_redaction: bool = False) -> PIIRedactor:
-    """Get global PII redactor instance."""
-    global _global_redactor
-    if _global_redactor is None or _global_redactor.enable_name_redaction != enable_name_redaction:
-        _global_redactor = PIIRedactor(enable_name_redaction=enable_name_redaction)
-    return _global_redactor
+    """Get shared PII redactor instance for the given configuration."""
+    return PIIRedactor(enable_name_redaction=enable_name_redaction)
 
 def redact_pii_from_text(text: str, enable_name_redaction: bool = False) -> str:
     """Quick function to redact PII from text."""
@@ -263,7 +263,12 @@ class SQLiteManager:
         """Create sample tables with data for testing."""
         if not self.connect():
             return
-        
+
+        # Seeding is disposable sample data: skip fsync and keep the rollback journal in memory.
+        # Both pragmas are scoped to this connection, which is closed once seeding finishes.
+        self.connection.execute("PRAGMA synchronous=OFF")
+        self.connection.execute("PRAGMA journal_mode=MEMORY")
+
         # Create sales table
         create_sales = """
         CREATE TABLE IF NOT EXISTS sales (